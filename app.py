@@ -11,7 +11,9 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
-from models.embedding_manager import EmbeddingManager
+from models.database import init_database
+from models.embedding_manager import get_embedding_manager
+from models.semantic_cache import SemanticCache
 from models.vector_store_manager import VectorStoreManager
 from services.chatbot_service import ChatbotService
 from services.document_service import DocumentService
@@ -70,11 +72,19 @@ def create_app():
     flask_app.config["CHUNK_SIZE"] = int(chunk_size)
     flask_app.config["CHUNK_OVERLAP"] = int(chunk_overlap)
 
+    # Responses to questions at least this similar to a cached one are reused
+    flask_app.config["SEMANTIC_CACHE_THRESHOLD"] = float(
+        os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")
+    )
+
     # Vector store configuration
     flask_app.config["VECTOR_STORE_PATH"] = os.getenv(
         "VECTOR_STORE_PATH", "./data/vector_stores"
     )
 
+    # Request threads of the production server (run.py)
+    flask_app.config["WAITRESS_THREADS"] = int(os.getenv("WAITRESS_THREADS", "8"))
+
     # Database configuration
     flask_app.config["DATABASE_PATH"] = os.getenv("DATABASE_PATH", "./data/chatbots.db")
 
@@ -98,10 +108,12 @@ def create_app():
 
     # Initialize services on startup
     try:
+        # Creates missing tables and adds columns that older databases lack
+        logger.info("Checking database schema...")
+        init_database()
+
         logger.info("Initializing embedding manager...")
-        embedding_manager = EmbeddingManager(
-            model_name=flask_app.config["EMBEDDING_MODEL"]
-        )
+        embedding_manager = get_embedding_manager(flask_app.config["EMBEDDING_MODEL"])
         flask_app.embedding_manager = embedding_manager
 
         logger.info("Initializing vector store manager...")
@@ -110,8 +122,17 @@ def create_app():
         )
         flask_app.vector_store_manager = vector_store_manager
 
+        # Shared so that chatbot and document changes drop cached answers
+        semantic_cache = SemanticCache(
+            threshold=flask_app.config["SEMANTIC_CACHE_THRESHOLD"]
+        )
+
         logger.info("Initializing chatbot service...")
-        chatbot_service = ChatbotService(vector_store_manager=vector_store_manager)
+        chatbot_service = ChatbotService(
+            vector_store_manager=vector_store_manager,
+            semantic_cache=semantic_cache,
+            upload_folder=flask_app.config["UPLOAD_FOLDER"],
+        )
         flask_app.chatbot_service = chatbot_service
 
         logger.info("Initializing document service...")
@@ -119,6 +140,7 @@ def create_app():
             embedding_manager=embedding_manager,
             vector_store_manager=vector_store_manager,
             upload_folder=flask_app.config["UPLOAD_FOLDER"],
+            chatbot_service=chatbot_service,
         )
         flask_app.document_service = document_service
 
@@ -128,6 +150,9 @@ def create_app():
                 embedding_manager=embedding_manager,
                 vector_store_manager=vector_store_manager,
                 gemini_api_key=flask_app.config["GEMINI_API_KEY"],
+                chatbot_service=chatbot_service,
+                semantic_cache=semantic_cache,
+                embed_workers=flask_app.config["WAITRESS_THREADS"],
             )
             flask_app.query_service = query_service
         else:
@@ -270,8 +295,11 @@ def register_error_handlers(flask_app):
         )
 
 
-# Create the application instance
-app = create_app()
+# Create the application instance. Document extraction workers are started
+# with forkserver/spawn, which re-import the main module as __mp_main__; they
+# need no app of their own.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == "__main__":
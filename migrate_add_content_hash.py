@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: Add content_hash field to documents table
+
+This script adds the 'content_hash' column to the documents table if it doesn't
+exist. Documents uploaded before the migration keep a NULL hash.
+Safe to run multiple times.
+"""
+
+import sqlite3
+import os
+
+from models.database import ensure_content_hash_column
+
+DATABASE_PATH = os.getenv('DATABASE_PATH', './data/chatbots.db')
+
+def migrate_add_content_hash():
+    """
+    Migration to add content_hash field to documents table.
+    Safe to run multiple times - checks if column exists first.
+    """
+    # Ensure the data directory exists
+    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        cursor = conn.cursor()
+
+        if ensure_content_hash_column(cursor):
+            conn.commit()
+            print("✅ Added 'content_hash' column to documents table")
+        else:
+            print("ℹ️  Column 'content_hash' already exists in documents table - no migration needed")
+
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Add content_hash field to documents table")
+    print("=" * 60)
+    print()
+
+    try:
+        migrate_add_content_hash()
+        print()
+        print("✅ Migration completed successfully!")
+        print()
+    except Exception as e:
+        print()
+        print(f"❌ Migration failed: {str(e)}")
+        print()
+        exit(1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: Add document_count field to chatbots table
+
+This script adds the 'document_count' column to the chatbots table, fills it
+from the existing documents, and creates the triggers that keep it current.
+Safe to run multiple times.
+"""
+
+import sqlite3
+import os
+
+from models.database import backfill_document_counts, ensure_document_count_column
+
+DATABASE_PATH = os.getenv('DATABASE_PATH', './data/chatbots.db')
+
+def migrate_add_document_count():
+    """
+    Migration to add document_count field to chatbots table.
+    Safe to run multiple times - checks if column exists first.
+    """
+    # Ensure the data directory exists
+    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        cursor = conn.cursor()
+
+        if ensure_document_count_column(cursor):
+            print("✅ Added 'document_count' column to chatbots table")
+        else:
+            print("ℹ️  Column 'document_count' already exists in chatbots table")
+            # Repair counts that may have drifted before the triggers existed
+            backfill_document_counts(cursor)
+
+        conn.commit()
+        print("✅ Document counts backfilled and triggers installed")
+
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Database Migration: Add document_count field to chatbots table")
+    print("=" * 60)
+    print()
+
+    try:
+        migrate_add_document_count()
+        print()
+        print("✅ Migration completed successfully!")
+        print()
+    except Exception as e:
+        print()
+        print(f"❌ Migration failed: {str(e)}")
+        print()
+        exit(1)
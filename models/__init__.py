@@ -7,7 +7,8 @@ from .database import (
     reset_database,
     DATABASE_PATH
 )
-from .embedding_manager import EmbeddingManager
+from .embedding_manager import EmbeddingManager, get_embedding_manager
+from .semantic_cache import SemanticCache
 from .vector_store_manager import VectorStoreManager
 
 __all__ = [
@@ -17,5 +18,7 @@ __all__ = [
     'reset_database',
     'DATABASE_PATH',
     'EmbeddingManager',
+    'get_embedding_manager',
+    'SemanticCache',
     'VectorStoreManager'
 ]
@@ -3,14 +3,21 @@ Database schema and utility functions for the RAG Chatbot Platform.
 """
 import sqlite3
 import os
+import queue
 from contextlib import contextmanager
-from typing import Optional
+from typing import Iterable, Optional
 from datetime import datetime
 
 
 # Database configuration
 DATABASE_PATH = os.getenv('DATABASE_PATH', './data/chatbots.db')
 
+# Maximum number of idle connections kept for reuse by get_db_connection()
+POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '8'))
+
+# Idle connections, most recently returned first so warm caches get reused
+_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
 
 def get_connection():
     """
@@ -22,11 +29,29 @@ def get_connection():
     # Ensure the data directory exists
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     
-    conn = sqlite3.connect(DATABASE_PATH)
+    # Pooled connections are handed between threads, one user at a time.
+    # A larger statement cache keeps every prepared query of the services hot.
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, cached_statements=128)
     conn.row_factory = sqlite3.Row  # Enable column access by name
     
     # Enable foreign key constraints
     conn.execute("PRAGMA foreign_keys = ON")
+
+    # Use a larger page cache (64MB) than SQLite's 2MB default
+    conn.execute("PRAGMA cache_size = -65536")
+
+    # Write-ahead logging lets readers proceed while a write is in progress
+    conn.execute("PRAGMA journal_mode = WAL")
+
+    # In WAL mode NORMAL only syncs at checkpoints, not on every commit;
+    # committed transactions stay durable across application crashes
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    # Keep temporary tables and indices (sorts, GROUP BY) in memory
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+    # Read the database file through a memory map of up to 256MB
+    conn.execute("PRAGMA mmap_size = 268435456")
     
     return conn
 
@@ -35,21 +60,45 @@ def get_connection():
 def get_db_connection():
     """
     Context manager for database connections.
-    Automatically handles connection closing.
+    Commits on success and rolls back on error. Connections are borrowed
+    from a shared pool and returned to it afterwards instead of being closed.
     
     Usage:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(...)
     """
-    conn = get_connection()
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = get_connection()
+
     try:
         yield conn
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            # Connection is unusable, don't hand it out again
+            conn.close()
+            raise e
+        _release_connection(conn)
         raise e
-    finally:
+    else:
+        _release_connection(conn)
+
+
+def _release_connection(conn: sqlite3.Connection) -> None:
+    """
+    Return a connection to the pool, closing it if the pool is full.
+
+    Args:
+        conn: Connection with no open transaction
+    """
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
         conn.close()
 
 
@@ -68,6 +117,7 @@ def init_database():
                 name TEXT NOT NULL,
                 system_prompt TEXT NOT NULL,
                 status TEXT NOT NULL,
+                document_count INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -83,26 +133,164 @@ def init_database():
                 file_size INTEGER NOT NULL,
                 file_path TEXT NOT NULL,
                 status TEXT NOT NULL,
+                content_hash TEXT,
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (chatbot_id) REFERENCES chatbots(id) ON DELETE CASCADE
             )
         """)
         
-        # Create indexes for better query performance
+        # Databases created before uploads were hashed lack content_hash
+        if ensure_content_hash_column(cursor):
+            print("Added content_hash column to documents table")
+        
+        # Create chunk cache table: chunks and embeddings of document content,
+        # keyed by content hash and the model/chunking settings that made them
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_documents_chatbot_id 
-            ON documents(chatbot_id)
+            CREATE TABLE IF NOT EXISTS chunk_cache (
+                content_hash TEXT NOT NULL,
+                config_key TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (content_hash, config_key, chunk_index)
+            )
+        """)
+        
+        # Create indexes for better query performance. Including file_path
+        # lets the per-chatbot file path lookups be answered from the index
+        # alone; it also serves plain chatbot_id lookups, which makes the
+        # older single-column index redundant.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_documents_chatbot_file
+            ON documents(chatbot_id, file_path)
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_documents_chatbot_id")
+        
+        # Lets purge_chunk_cache check whether content is still in use
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_documents_content_hash
+            ON documents(content_hash)
         """)
         
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_chatbots_status 
             ON chatbots(status)
         """)
+
+        # Keep chatbots.document_count in step with the documents table,
+        # adding the column to databases created before it existed
+        if ensure_document_count_column(cursor):
+            print("Added document_count column to chatbots table")
         
         conn.commit()
         print(f"Database initialized successfully at {DATABASE_PATH}")
 
 
+def purge_chunk_cache(cursor: sqlite3.Cursor, content_hashes: Iterable[Optional[str]]) -> None:
+    """
+    Delete cached chunks of content that no document references any more.
+
+    Call after deleting documents, with the content hashes they had. Content
+    still used by another document (of any chatbot) keeps its cache rows.
+
+    Args:
+        cursor: Cursor on an open connection, in the deleting transaction
+        content_hashes: Content hashes of the deleted documents (None skipped)
+    """
+    cursor.executemany("""
+        DELETE FROM chunk_cache
+        WHERE content_hash = ?
+        AND NOT EXISTS (SELECT 1 FROM documents WHERE content_hash = ?)
+    """, [(content_hash, content_hash) for content_hash in set(content_hashes) if content_hash])
+
+
+def ensure_content_hash_column(cursor: sqlite3.Cursor) -> bool:
+    """
+    Add documents.content_hash if it is missing.
+
+    Documents uploaded before the column existed keep a NULL hash.
+
+    Args:
+        cursor: Cursor on a database with a documents table
+
+    Returns:
+        True if the column was added, False if it already existed
+    """
+    cursor.execute("PRAGMA table_info(documents)")
+    if 'content_hash' in [row[1] for row in cursor.fetchall()]:
+        return False
+
+    cursor.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
+    return True
+
+
+def ensure_document_count_column(cursor: sqlite3.Cursor) -> bool:
+    """
+    Add chatbots.document_count if it is missing, and install its triggers.
+
+    A newly added column is filled from the documents table.
+
+    Args:
+        cursor: Cursor on a database with chatbots and documents tables
+
+    Returns:
+        True if the column was added, False if it already existed
+    """
+    cursor.execute("PRAGMA table_info(chatbots)")
+    added = 'document_count' not in [row[1] for row in cursor.fetchall()]
+
+    if added:
+        cursor.execute("""
+            ALTER TABLE chatbots
+            ADD COLUMN document_count INTEGER NOT NULL DEFAULT 0
+        """)
+        backfill_document_counts(cursor)
+
+    create_document_count_triggers(cursor)
+    return added
+
+
+def backfill_document_counts(cursor: sqlite3.Cursor) -> None:
+    """
+    Recompute chatbots.document_count from the documents table.
+
+    Args:
+        cursor: Cursor on a database whose chatbots table has document_count
+    """
+    cursor.execute("""
+        UPDATE chatbots
+        SET document_count = (
+            SELECT COUNT(*) FROM documents WHERE documents.chatbot_id = chatbots.id
+        )
+    """)
+
+
+def create_document_count_triggers(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the triggers that maintain chatbots.document_count.
+
+    Args:
+        cursor: Cursor on a database whose chatbots table has document_count
+    """
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_documents_count_insert
+        AFTER INSERT ON documents
+        BEGIN
+            UPDATE chatbots SET document_count = document_count + 1
+            WHERE id = NEW.chatbot_id;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_documents_count_delete
+        AFTER DELETE ON documents
+        BEGIN
+            UPDATE chatbots SET document_count = document_count - 1
+            WHERE id = OLD.chatbot_id;
+        END
+    """)
+
+
 def drop_tables():
     """
     Drop all tables from the database.
@@ -110,6 +298,7 @@ def drop_tables():
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute("DROP TABLE IF EXISTS chunk_cache")
         cursor.execute("DROP TABLE IF EXISTS documents")
         cursor.execute("DROP TABLE IF EXISTS chatbots")
         conn.commit()
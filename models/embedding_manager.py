@@ -3,6 +3,7 @@ Embedding Manager for generating document embeddings using Sentence Transformers
 """
 
 import logging
+from functools import lru_cache
 from typing import List, Union
 import numpy as np
 
@@ -68,15 +69,21 @@ class EmbeddingManager:
         except Exception as e:
             raise Exception(f"Failed to load model '{self.model_name}': {str(e)}")
     
-    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
         """
         Generate embeddings from text using the loaded model.
         
+        Embeddings are always L2-normalized to unit length, so documents and
+        queries encoded here are directly comparable and L2 distance ranks
+        results the same way cosine similarity does.
+        
         Args:
             texts: Single text string or list of text strings to encode
+            batch_size: Number of texts the model encodes per forward pass
             
         Returns:
-            NumPy array of embeddings with shape (n_texts, embedding_dimension)
+            C-contiguous float32 NumPy array of embeddings with shape
+            (n_texts, embedding_dimension)
             
         Raises:
             ValueError: If model is not loaded or texts is empty
@@ -95,9 +102,15 @@ class EmbeddingManager:
         try:
             embeddings = self.model.encode(
                 texts,
+                batch_size=batch_size,
                 convert_to_numpy=True,
+                normalize_embeddings=True,
                 show_progress_bar=False
             )
+            # FAISS only takes C-contiguous float32; converting here (a no-op
+            # when the model already produced that) saves a copy at every
+            # index call downstream
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
             logger.debug(f"Generated embeddings for {len(texts)} text(s)")
             return embeddings
         except Exception as e:
@@ -123,3 +136,25 @@ class EmbeddingManager:
             logger.debug(f"Embedding dimension: {self._dimension}")
         
         return self._dimension
+
+
+@lru_cache(maxsize=None)
+def get_embedding_manager(model_name: str = "all-MiniLM-L6-v2") -> EmbeddingManager:
+    """
+    Return the process-wide EmbeddingManager for a model, loading it once.
+
+    The first call loads the model and runs a one-text warm-up encode so the
+    first real request doesn't pay for lazy initialization. Later calls
+    (including from background embedding jobs and repeated app creation)
+    reuse the same resident model.
+
+    Args:
+        model_name: Name of the Sentence Transformer model to load
+
+    Returns:
+        Shared EmbeddingManager instance
+    """
+    manager = EmbeddingManager(model_name=model_name)
+    manager.encode("warm up")
+    logger.info(f"Embedding model '{model_name}' loaded and warmed up")
+    return manager
@@ -0,0 +1,162 @@
+"""
+Semantic response cache keyed on query embeddings.
+"""
+
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _ChatbotEntries:
+    """
+    Cached answers for one version of one chatbot.
+    """
+
+    def __init__(self, version: str, dimension: int):
+        self.version = version
+        self.embeddings = np.empty((0, dimension), dtype=np.float32)
+        self.results: List[Dict[str, Any]] = []
+        self.expires: List[float] = []
+
+
+class SemanticCache:
+    """
+    In-process cache that serves stored answers to near-duplicate questions.
+
+    Entries are grouped per chatbot under a version string that callers
+    derive from the chatbot's configuration, so a changed prompt, model or
+    retrained store never serves answers produced under the old one.
+    Embeddings are expected to be L2-normalized (as EmbeddingManager.encode
+    produces them), which makes cosine similarity a plain dot product.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 256,
+        max_chatbots: int = 1024,
+        ttl: float = 3600.0
+    ):
+        """
+        Initialize the SemanticCache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached answer to be served
+            max_entries: Maximum cached answers kept per chatbot (oldest dropped first)
+            max_chatbots: Maximum chatbots with cached answers (least recently used dropped first)
+            ttl: Seconds a cached answer stays valid
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_chatbots = max_chatbots
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._chatbots: "OrderedDict[str, _ChatbotEntries]" = OrderedDict()
+
+        logger.info(f"SemanticCache initialized with similarity threshold {threshold}")
+
+    def lookup(
+        self,
+        chatbot_id: str,
+        version: str,
+        query_embedding: np.ndarray
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer to a question similar to the query.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            version: Version string of the chatbot's current configuration
+            query_embedding: Normalized query embedding, shape (dimension,) or (1, dimension)
+
+        Returns:
+            Copy of the most similar cached result if it clears the
+            threshold and hasn't expired, otherwise None
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+
+        with self._lock:
+            entries = self._chatbots.get(chatbot_id)
+            if entries is None or entries.version != version or not entries.results:
+                return None
+
+            if entries.embeddings.shape[1] != query.shape[0]:
+                return None
+
+            self._chatbots.move_to_end(chatbot_id)
+
+            similarities = entries.embeddings @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold or entries.expires[best] < time.monotonic():
+                return None
+
+            result = copy.deepcopy(entries.results[best])
+
+        logger.debug(f"Semantic cache hit for chatbot '{chatbot_id}' (similarity {similarity:.3f})")
+        return result
+
+    def put(
+        self,
+        chatbot_id: str,
+        version: str,
+        query_embedding: np.ndarray,
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Store an answer under its query embedding.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            version: Version string of the chatbot's current configuration
+            query_embedding: Normalized query embedding, shape (dimension,) or (1, dimension)
+            result: Result to serve for similar questions
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        stored = copy.deepcopy(result)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._chatbots.get(chatbot_id)
+            if (
+                entries is None
+                or entries.version != version
+                or entries.embeddings.shape[1] != query.shape[1]
+            ):
+                # A new configuration makes every earlier answer stale
+                entries = _ChatbotEntries(version, query.shape[1])
+                self._chatbots[chatbot_id] = entries
+            self._chatbots.move_to_end(chatbot_id)
+
+            # Drop expired answers, then the oldest ones beyond the limit
+            keep = [i for i, expires in enumerate(entries.expires) if expires >= now]
+            keep = keep[-(self.max_entries - 1):] if self.max_entries > 1 else []
+
+            entries.embeddings = np.vstack([entries.embeddings[keep], query])
+            entries.results = [entries.results[i] for i in keep] + [stored]
+            entries.expires = [entries.expires[i] for i in keep] + [now + self.ttl]
+
+            while len(self._chatbots) > self.max_chatbots:
+                self._chatbots.popitem(last=False)
+
+    def invalidate(self, chatbot_id: Optional[str] = None) -> None:
+        """
+        Drop cached answers for one chatbot, or for all chatbots.
+
+        Args:
+            chatbot_id: Chatbot whose answers are dropped; None drops everything
+        """
+        with self._lock:
+            if chatbot_id is None:
+                self._chatbots.clear()
+            else:
+                self._chatbots.pop(chatbot_id, None)
@@ -6,7 +6,8 @@ import os
 import json
 import logging
 import shutil
-from typing import List, Dict, Any, Optional, TYPE_CHECKING
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple, TYPE_CHECKING
 import numpy as np
 
 try:
@@ -14,12 +15,50 @@ try:
 except ImportError:
     faiss = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
     import faiss
 
 logger = logging.getLogger(__name__)
 
 
+def _read_metadata(path: str) -> Dict[str, Any]:
+    """
+    Read a store's metadata file, with orjson when it is installed.
+
+    Args:
+        path: Path to metadata.json
+
+    Returns:
+        Parsed metadata
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_metadata(path: str, metadata: Dict[str, Any]) -> None:
+    """
+    Write a store's metadata file, with orjson when it is installed.
+
+    Args:
+        path: Path to metadata.json
+        metadata: Metadata to write
+    """
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+
 class VectorStoreManager:
     """
     Manages FAISS vector stores for each chatbot.
@@ -46,10 +85,32 @@ class VectorStoreManager:
         
         self.base_path = base_path
         
+        # Vector counts per chatbot, keyed by the index file's (mtime, size)
+        # so a rewritten index is never reported with a stale count
+        self._counts: Dict[str, Tuple[Tuple[int, int], int]] = {}
+        
+        # Per-chatbot locks held across each read-modify-write of a store,
+        # so a deletion can't be overwritten by a concurrent add (or vice versa)
+        self._store_locks: Dict[str, threading.Lock] = {}
+        self._store_locks_guard = threading.Lock()
+        
         # Create base directory if it doesn't exist
         os.makedirs(base_path, exist_ok=True)
         logger.info(f"VectorStoreManager initialized with base path: {base_path}")
     
+    def _store_lock(self, chatbot_id: str) -> threading.Lock:
+        """
+        Get the lock serializing writes to a chatbot's vector store.
+        
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            
+        Returns:
+            Lock for the chatbot's store
+        """
+        with self._store_locks_guard:
+            return self._store_locks.setdefault(chatbot_id, threading.Lock())
+    
     def _get_store_path(self, chatbot_id: str) -> str:
         """
         Get the directory path for a chatbot's vector store.
@@ -114,8 +175,13 @@ class VectorStoreManager:
             # Create directory for this chatbot's vector store
             os.makedirs(store_path, exist_ok=True)
             
-            # Create FAISS index using L2 distance (Euclidean)
-            index = faiss.IndexFlatL2(dimension)
+            # Create FAISS index using L2 distance (Euclidean). Vectors are
+            # stored as fp16, which halves memory and disk per store with no
+            # noticeable effect on retrieval; FAISS still takes and returns
+            # float32 at the API boundary.
+            index = faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2
+            )
             
             # Save the empty index
             index_path = self._get_index_path(chatbot_id)
@@ -130,8 +196,7 @@ class VectorStoreManager:
             }
             
             metadata_path = self._get_metadata_path(chatbot_id)
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
+            _write_metadata(metadata_path, metadata)
             
             logger.info(f"Created vector store for chatbot '{chatbot_id}' with dimension {dimension}")
             return index
@@ -163,7 +228,9 @@ class VectorStoreManager:
             raise FileNotFoundError(f"Vector store for chatbot '{chatbot_id}' not found")
         
         try:
+            stat = os.stat(index_path)
             index = faiss.read_index(index_path)
+            self._counts[chatbot_id] = ((stat.st_mtime_ns, stat.st_size), index.ntotal)
             logger.info(f"Loaded vector store for chatbot '{chatbot_id}' with {index.ntotal} vectors")
             return index
             
@@ -171,6 +238,36 @@ class VectorStoreManager:
             logger.error(f"Failed to load vector store for chatbot '{chatbot_id}': {str(e)}")
             raise Exception(f"Vector store loading failed: {str(e)}")
 
+    def count(self, chatbot_id: str) -> int:
+        """
+        Get the number of vectors in a chatbot's store.
+        
+        The count is remembered per index file version, so repeated calls
+        cost a stat rather than reading the index.
+        
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            
+        Returns:
+            Number of vectors in the index
+            
+        Raises:
+            FileNotFoundError: If vector store doesn't exist
+            Exception: If loading fails
+        """
+        index_path = self._get_index_path(chatbot_id)
+        
+        try:
+            stat = os.stat(index_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Vector store for chatbot '{chatbot_id}' not found")
+        
+        cached = self._counts.get(chatbot_id)
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+        
+        return self.load_store(chatbot_id).ntotal
+
     def add_documents(
         self, 
         chatbot_id: str, 
@@ -195,68 +292,102 @@ class VectorStoreManager:
         if not texts or len(texts) == 0:
             raise ValueError("Cannot add empty texts list")
         
-        if embeddings.shape[0] != len(texts):
-            raise ValueError(
-                f"Mismatch between number of texts ({len(texts)}) "
-                f"and embeddings ({embeddings.shape[0]})"
-            )
+        self.add_document_batches(chatbot_id, [(texts, embeddings, metadata)])
+    
+    def add_document_batches(
+        self,
+        chatbot_id: str,
+        batches: Iterable[Tuple[List[str], np.ndarray, List[Dict[str, Any]]]]
+    ) -> int:
+        """
+        Add documents to the vector store from a stream of batches.
         
-        if len(metadata) != len(texts):
-            raise ValueError(
-                f"Mismatch between number of texts ({len(texts)}) "
-                f"and metadata entries ({len(metadata)})"
-            )
+        Each batch's embeddings go into the index as soon as it arrives, so
+        callers can produce batches lazily and only one batch of embeddings
+        needs to be held at a time. The index and metadata files are written
+        once, after the last batch, and other writers to the store wait
+        until then.
         
-        try:
-            # Load existing index
-            index = self.load_store(chatbot_id)
-            
-            # Verify embedding dimension matches
-            if embeddings.shape[1] != index.d:
-                raise ValueError(
-                    f"Embedding dimension ({embeddings.shape[1]}) "
-                    f"doesn't match index dimension ({index.d})"
-                )
-            
-            # Add embeddings to index
-            index.add(embeddings.astype('float32'))
-            
-            # Save updated index
-            index_path = self._get_index_path(chatbot_id)
-            faiss.write_index(index, index_path)
-            
-            # Load and update metadata
-            metadata_path = self._get_metadata_path(chatbot_id)
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                store_metadata = json.load(f)
-            
-            # Add new documents to metadata
-            for i, (text, meta) in enumerate(zip(texts, metadata)):
-                doc_entry = {
-                    "id": store_metadata["total_documents"] + i,
-                    "text": text,
-                    **meta
-                }
-                store_metadata["documents"].append(doc_entry)
-            
-            store_metadata["total_documents"] += len(texts)
-            
-            # Save updated metadata
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(store_metadata, f, indent=2)
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            batches: Iterable of (texts, embeddings, metadata) tuples, where
+                embeddings has shape (len(texts), dimension)
             
-            logger.info(
-                f"Added {len(texts)} documents to vector store for chatbot '{chatbot_id}'. "
-                f"Total documents: {store_metadata['total_documents']}"
-            )
+        Returns:
+            Number of documents added
             
-        except FileNotFoundError:
-            raise
-        except ValueError:
-            raise
-        except Exception as e:
-            logger.error(f"Failed to add documents to vector store for chatbot '{chatbot_id}': {str(e)}")
-            raise Exception(f"Adding documents failed: {str(e)}")
+        Raises:
+            ValueError: If a batch is invalid or mismatched
+            FileNotFoundError: If vector store doesn't exist
+            Exception: If adding documents fails
+        """
+        with self._store_lock(chatbot_id):
+            try:
+                # Load existing index and metadata
+                index = self.load_store(chatbot_id)
+                
+                metadata_path = self._get_metadata_path(chatbot_id)
+                store_metadata = _read_metadata(metadata_path)
+                
+                added = 0
+                for texts, embeddings, metadata in batches:
+                    if embeddings.shape[0] != len(texts):
+                        raise ValueError(
+                            f"Mismatch between number of texts ({len(texts)}) "
+                            f"and embeddings ({embeddings.shape[0]})"
+                        )
+                    
+                    if len(metadata) != len(texts):
+                        raise ValueError(
+                            f"Mismatch between number of texts ({len(texts)}) "
+                            f"and metadata entries ({len(metadata)})"
+                        )
+                    
+                    # Verify embedding dimension matches
+                    if embeddings.shape[1] != index.d:
+                        raise ValueError(
+                            f"Embedding dimension ({embeddings.shape[1]}) "
+                            f"doesn't match index dimension ({index.d})"
+                        )
+                    
+                    # Add embeddings to index
+                    index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+                    
+                    # Add new documents to metadata
+                    for i, (text, meta) in enumerate(zip(texts, metadata)):
+                        doc_entry = {
+                            "id": store_metadata["total_documents"] + i,
+                            "text": text,
+                            **meta
+                        }
+                        store_metadata["documents"].append(doc_entry)
+                    
+                    store_metadata["total_documents"] += len(texts)
+                    added += len(texts)
+                
+                if not added:
+                    return 0
+                
+                # Save updated index
+                index_path = self._get_index_path(chatbot_id)
+                faiss.write_index(index, index_path)
+                
+                # Save updated metadata
+                _write_metadata(metadata_path, store_metadata)
+                
+                logger.info(
+                    f"Added {added} documents to vector store for chatbot '{chatbot_id}'. "
+                    f"Total documents: {store_metadata['total_documents']}"
+                )
+                return added
+                
+            except FileNotFoundError:
+                raise
+            except ValueError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to add documents to vector store for chatbot '{chatbot_id}': {str(e)}")
+                raise Exception(f"Adding documents failed: {str(e)}")
 
     def similarity_search(
         self, 
@@ -275,6 +406,35 @@ class VectorStoreManager:
         Returns:
             List of dictionaries containing retrieved documents with metadata and scores
             
+        Raises:
+            ValueError: If inputs are invalid
+            FileNotFoundError: If vector store doesn't exist
+            Exception: If search fails
+        """
+        if query_embedding.ndim == 1:
+            query_embedding = query_embedding.reshape(1, -1)
+        
+        return self.similarity_search_batch(chatbot_id, query_embedding[:1], k=k)[0]
+    
+    def similarity_search_batch(
+        self,
+        chatbot_id: str,
+        query_embeddings: np.ndarray,
+        k: int = 4
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform similarity search for several queries in one index call.
+        
+        The index and metadata are loaded once for the whole batch.
+        
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            query_embeddings: Query embeddings with shape (n_queries, dimension)
+            k: Number of most similar documents to retrieve per query
+            
+        Returns:
+            One list of retrieved documents (with metadata and scores) per query
+            
         Raises:
             ValueError: If inputs are invalid
             FileNotFoundError: If vector store doesn't exist
@@ -283,27 +443,25 @@ class VectorStoreManager:
         if k <= 0:
             raise ValueError(f"Invalid k value: {k}. Must be positive.")
         
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
+        
         try:
             # Load index and metadata
             index = self.load_store(chatbot_id)
             
             metadata_path = self._get_metadata_path(chatbot_id)
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                store_metadata = json.load(f)
+            store_metadata = _read_metadata(metadata_path)
             
             # Check if index is empty
             if index.ntotal == 0:
                 logger.warning(f"Vector store for chatbot '{chatbot_id}' is empty")
-                return []
-            
-            # Reshape query embedding if needed
-            if query_embedding.ndim == 1:
-                query_embedding = query_embedding.reshape(1, -1)
+                return [[] for _ in range(query_embeddings.shape[0])]
             
             # Verify embedding dimension
-            if query_embedding.shape[1] != index.d:
+            if query_embeddings.shape[1] != index.d:
                 raise ValueError(
-                    f"Query embedding dimension ({query_embedding.shape[1]}) "
+                    f"Query embedding dimension ({query_embeddings.shape[1]}) "
                     f"doesn't match index dimension ({index.d})"
                 )
             
@@ -311,30 +469,37 @@ class VectorStoreManager:
             k = min(k, index.ntotal)
             
             # Perform similarity search
-            distances, indices = index.search(query_embedding.astype('float32'), k)
+            distances, indices = index.search(
+                np.ascontiguousarray(query_embeddings, dtype=np.float32), k
+            )
             
             # Retrieve documents with metadata
-            results = []
-            for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx < len(store_metadata["documents"]):
-                    doc = store_metadata["documents"][idx].copy()
-                    doc["score"] = float(distance)
-                    doc["rank"] = i + 1
-                    results.append(doc)
+            documents = store_metadata["documents"]
+            batch_results = []
+            for row_distances, row_indices in zip(distances, indices):
+                results = []
+                for i, (distance, idx) in enumerate(zip(row_distances, row_indices)):
+                    if 0 <= idx < len(documents):
+                        doc = documents[idx].copy()
+                        doc["score"] = float(distance)
+                        doc["rank"] = i + 1
+                        results.append(doc)
+                batch_results.append(results)
             
             logger.info(
                 f"FAISS search completed for chatbot '{chatbot_id}': "
-                f"Retrieved {len(results)} documents from {index.ntotal} total vectors (k={k})"
+                f"{len(batch_results)} queries against {index.ntotal} total vectors (k={k})"
             )
             
-            if results:
-                logger.debug(
-                    f"Distance statistics - Min: {min(r['score'] for r in results):.3f}, "
-                    f"Max: {max(r['score'] for r in results):.3f}, "
-                    f"Avg: {sum(r['score'] for r in results) / len(results):.3f}"
-                )
+            for results in batch_results:
+                if results:
+                    logger.debug(
+                        f"Distance statistics - Min: {min(r['score'] for r in results):.3f}, "
+                        f"Max: {max(r['score'] for r in results):.3f}, "
+                        f"Avg: {sum(r['score'] for r in results) / len(results):.3f}"
+                    )
             
-            return results
+            return batch_results
             
         except FileNotFoundError:
             raise
@@ -344,26 +509,100 @@ class VectorStoreManager:
             logger.error(f"Failed to perform similarity search for chatbot '{chatbot_id}': {str(e)}")
             raise Exception(f"Similarity search failed: {str(e)}")
     
-    def delete_store(self, chatbot_id: str) -> None:
+    def delete_by_metadata(self, chatbot_id: str, filter: Dict[str, Any]) -> int:
         """
-        Remove a chatbot's vector store completely.
+        Remove the vectors whose metadata matches every key/value in a filter.
+        
+        FAISS flat indices compact in place on removal, so the remaining
+        metadata entries are renumbered to keep positions aligned.
         
         Args:
             chatbot_id: Unique identifier for the chatbot
+            filter: Metadata values to match (e.g. {"document_id": "..."})
+            
+        Returns:
+            Number of vectors removed
             
         Raises:
+            ValueError: If the filter is empty
             FileNotFoundError: If vector store doesn't exist
+            NotImplementedError: If the index type can't remove vectors
             Exception: If deletion fails
         """
-        store_path = self._get_store_path(chatbot_id)
+        if not filter:
+            raise ValueError("Cannot delete by an empty metadata filter")
         
-        if not os.path.exists(store_path):
-            raise FileNotFoundError(f"Vector store for chatbot '{chatbot_id}' not found")
+        with self._store_lock(chatbot_id):
+            try:
+                index = self.load_store(chatbot_id)
+                
+                metadata_path = self._get_metadata_path(chatbot_id)
+                store_metadata = _read_metadata(metadata_path)
+                
+                documents = store_metadata["documents"]
+                positions = [
+                    i for i, doc in enumerate(documents)
+                    if all(doc.get(key) == value for key, value in filter.items())
+                ]
+                
+                if not positions:
+                    return 0
+                
+                try:
+                    index.remove_ids(np.array(positions, dtype='int64'))
+                except RuntimeError as e:
+                    raise NotImplementedError(
+                        f"Index for chatbot '{chatbot_id}' does not support removing vectors: {str(e)}"
+                    ) from e
+                
+                # Save updated index
+                index_path = self._get_index_path(chatbot_id)
+                faiss.write_index(index, index_path)
+                
+                # Drop the removed entries and renumber the rest by position
+                removed = set(positions)
+                remaining = [doc for i, doc in enumerate(documents) if i not in removed]
+                for i, doc in enumerate(remaining):
+                    doc["id"] = i
+                
+                store_metadata["documents"] = remaining
+                store_metadata["total_documents"] = len(remaining)
+                
+                _write_metadata(metadata_path, store_metadata)
+                
+                logger.info(
+                    f"Removed {len(positions)} vectors from vector store for chatbot '{chatbot_id}'. "
+                    f"Total documents: {len(remaining)}"
+                )
+                return len(positions)
+                
+            except (FileNotFoundError, NotImplementedError):
+                raise
+            except Exception as e:
+                logger.error(f"Failed to delete vectors for chatbot '{chatbot_id}': {str(e)}")
+                raise Exception(f"Vector deletion failed: {str(e)}")
+    
+    def delete_store(self, chatbot_id: str) -> None:
+        """
+        Remove a chatbot's vector store completely.
         
-        try:
-            shutil.rmtree(store_path)
-            logger.info(f"Deleted vector store for chatbot '{chatbot_id}'")
+        Args:
+            chatbot_id: Unique identifier for the chatbot
             
-        except Exception as e:
-            logger.error(f"Failed to delete vector store for chatbot '{chatbot_id}': {str(e)}")
-            raise Exception(f"Vector store deletion failed: {str(e)}")
+        Raises:
+            FileNotFoundError: If vector store doesn't exist
+            Exception: If deletion fails
+        """
+        with self._store_lock(chatbot_id):
+            store_path = self._get_store_path(chatbot_id)
+            
+            if not os.path.exists(store_path):
+                raise FileNotFoundError(f"Vector store for chatbot '{chatbot_id}' not found")
+            
+            try:
+                shutil.rmtree(store_path)
+                logger.info(f"Deleted vector store for chatbot '{chatbot_id}'")
+                
+            except Exception as e:
+                logger.error(f"Failed to delete vector store for chatbot '{chatbot_id}': {str(e)}")
+                raise Exception(f"Vector store deletion failed: {str(e)}")
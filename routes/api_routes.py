@@ -5,11 +5,24 @@ Provides REST API endpoints for chatbot management, document upload,
 status checking, querying, and deletion.
 """
 
+import json
 import logging
-from flask import Blueprint, request, jsonify, current_app, session
+from flask import Blueprint, Response, request, jsonify, current_app, session, stream_with_context
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+
+def _json_text(data) -> str:
+    """Serialize data to JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data)
+
 # Create API blueprint
 api_bp = Blueprint('api', __name__)
 
@@ -173,12 +186,13 @@ def upload_documents(chatbot_id):
             chatbot_id
         )
 
-        # Start embedding generation in background (for now, call synchronously)
-        # In production, this should be done asynchronously using a task queue
+        # Generate embeddings in the background; clients poll the status
+        # endpoint until the chatbot is ready
         try:
-            document_service.generate_embeddings(chatbot_id)
+            document_service.enqueue_embedding_job(chatbot_id)
+            result['embedding_status'] = 'queued'
         except Exception as e:
-            logger.error("Failed to generate embeddings: %s", str(e))
+            logger.error("Failed to queue embedding generation: %s", str(e))
             # Return success for upload but note embedding failure
             result['embedding_status'] = 'failed'
             result['embedding_error'] = str(e)
@@ -499,6 +513,115 @@ def query_chatbot(chatbot_id):
 
 
 
+@api_bp.route('/chatbot/<chatbot_id>/query/stream', methods=['POST'])
+def stream_query_chatbot(chatbot_id):
+    """
+    Submit a query to a chatbot and stream the response as Server-Sent Events.
+
+    URL Parameters:
+        - chatbot_id: Unique identifier of the chatbot
+
+    Request Body (JSON):
+        - question: User's question (required, non-empty string)
+        - chat_history: Optional conversation history (list of role/content dicts)
+
+    Returns:
+        text/event-stream response (200 OK) with events:
+            - sources: JSON with sources and chatbot_id, sent first
+            - message (default): JSON {"text": ...} for each piece of the answer
+            - done: sent once the answer is complete
+            - error: JSON {"message": ...} if generation fails mid-stream
+        or a JSON error (400 Bad Request, 404 Not Found, 503 Service Unavailable,
+        500 Internal Server Error) if the query fails before streaming starts
+
+    Unlike the non-streaming endpoint, history is not read from or written to
+    the session (the session cookie can't change once streaming has begun),
+    so clients pass chat_history themselves.
+    """
+    try:
+        query_service = current_app.query_service
+        if query_service is None:
+            return jsonify({
+                "error": {
+                    "code": "SERVICE_UNAVAILABLE",
+                    "message": "Query service is not available. Gemini API key may not be configured."
+                }
+            }), 503
+
+        if not request.is_json:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Request must be JSON"
+                }
+            }), 400
+
+        data = request.get_json()
+        question = data.get('question')
+
+        if not question or not isinstance(question, str) or not question.strip():
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "Question is required and cannot be empty"
+                }
+            }), 400
+
+        chat_history = data.get('chat_history', [])
+        if chat_history and not isinstance(chat_history, list):
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "chat_history must be a list"
+                }
+            }), 400
+
+        metadata, chunks = query_service.stream_query(
+            chatbot_id,
+            question.strip(),
+            chat_history=chat_history
+        )
+
+        def events():
+            yield f"event: sources\ndata: {_json_text(metadata)}\n\n"
+            try:
+                for text in chunks:
+                    yield f"data: {_json_text({'text': text})}\n\n"
+            except Exception as e:
+                logger.error("Error streaming query for chatbot '%s': %s", chatbot_id, str(e))
+                yield f"event: error\ndata: {_json_text({'message': 'Failed to generate response'})}\n\n"
+                return
+            yield "event: done\ndata: {}\n\n"
+
+        logger.info("Streaming query response for chatbot '%s'", chatbot_id)
+
+        return Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    except ValueError as e:
+        logger.warning("Validation error in stream_query_chatbot: %s", str(e))
+        error_message = str(e)
+        code, status = ("NOT_FOUND", 404) if "not found" in error_message.lower() else ("VALIDATION_ERROR", 400)
+        return jsonify({
+            "error": {
+                "code": code,
+                "message": error_message
+            }
+        }), status
+    except Exception as e:
+        logger.error("Error processing streaming query for chatbot '%s': %s", chatbot_id, str(e))
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "Failed to process query",
+                "details": str(e) if current_app.config.get('ENV') == 'development' else None
+            }
+        }), 500
+
+
 @api_bp.route('/chatbot/<chatbot_id>/documents/<document_id>', methods=['DELETE'])
 def delete_document(chatbot_id, document_id):
     """
@@ -653,7 +776,10 @@ def test_gemini():
     """Test Gemini API connectivity and list available models."""
     try:
         import google.generativeai as genai
-        genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
+        # QueryService configures the SDK once at startup; configuring it
+        # again would drop its cached API clients and their connections
+        if current_app.query_service is None:
+            genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
         
         # List available models
         available_models = []
@@ -711,6 +837,7 @@ def upload_draft_files():
     try:
         import uuid
         import os
+        import shutil
         from werkzeug.utils import secure_filename
 
         # Get or generate draft_id
@@ -793,7 +920,8 @@ def upload_draft_files():
                 file_id = str(uuid.uuid4())
                 unique_filename = f"{file_id}.{file_ext}"
                 file_path = os.path.join(draft_folder, unique_filename)
-                file.save(file_path)
+                with open(file_path, 'wb') as out:
+                    shutil.copyfileobj(file.stream, out, 1 << 20)
 
                 # Store original filename in metadata
                 metadata[file_id] = {
@@ -1055,8 +1183,8 @@ Do not include any preamble, explanation, or meta-commentary. Return ONLY the sy
 System Prompt:"""
 
             try:
+                # The SDK was already configured by QueryService at startup
                 import google.generativeai as genai
-                genai.configure(api_key=current_app.config['GEMINI_API_KEY'])
                 
                 # Use gemini-2.5-flash (same as chatbot queries)
                 model = genai.GenerativeModel('gemini-2.5-flash')
@@ -1229,13 +1357,13 @@ def copy_draft_files_to_chatbot(chatbot_id):
                     
                     copied_files.append(new_file_id)
             
-            # Generate embeddings
+            # Generate embeddings in the background
             if copied_files:
                 try:
                     document_service = current_app.document_service
-                    document_service.generate_embeddings(chatbot_id)
+                    document_service.enqueue_embedding_job(chatbot_id)
                 except Exception as e:
-                    logger.error("Failed to generate embeddings: %s", str(e))
+                    logger.error("Failed to queue embedding generation: %s", str(e))
 
         return jsonify({
             "success": True,
@@ -1380,13 +1508,13 @@ def deploy_chatbot():
                     
                     draft_files.append(new_file_id)
             
-            # Generate embeddings
+            # Generate embeddings in the background
             if draft_files:
                 try:
                     document_service = current_app.document_service
-                    document_service.generate_embeddings(chatbot_id)
+                    document_service.enqueue_embedding_job(chatbot_id)
                 except Exception as e:
-                    logger.error("Failed to generate embeddings: %s", str(e))
+                    logger.error("Failed to queue embedding generation: %s", str(e))
                     # Continue even if embedding generation fails
 
             # Clean up draft folder
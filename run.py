@@ -8,6 +8,7 @@ This script checks for required environment variables and starts the Flask appli
 import os
 import sys
 import logging
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,56 +22,95 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Environment variables the application needs, with descriptions for reporting
+REQUIRED_VARS = {
+    "GEMINI_API_KEY": "Google Gemini API key for LLM responses"
+}
+
+OPTIONAL_VARS = {
+    "FLASK_SECRET_KEY": "Flask secret key (will use default in development)",
+    "EMBEDDING_MODEL": "Sentence Transformer model name (default: all-MiniLM-L6-v2)",
+    "DATABASE_PATH": "SQLite database path (default: ./data/chatbots.db)",
+    "VECTOR_STORE_PATH": "Vector store path (default: ./data/vector_stores)",
+    "UPLOAD_FOLDER": "Upload folder path (default: ./data/uploads)"
+}
+
+_REQUIRED_NAMES = frozenset(REQUIRED_VARS)
+_OPTIONAL_NAMES = frozenset(OPTIONAL_VARS)
+_CHECKED_NAMES = _REQUIRED_NAMES | _OPTIONAL_NAMES
+
+
 def check_environment():
     """
     Check for required environment variables.
     
+    Repeated calls with the same set of variables present reuse the
+    previous result without logging the report again.
+
     Returns:
         bool: True if all required variables are set, False otherwise
     """
-    required_vars = {
-        "GEMINI_API_KEY": "Google Gemini API key for LLM responses"
-    }
-    
-    optional_vars = {
-        "FLASK_SECRET_KEY": "Flask secret key (will use default in development)",
-        "EMBEDDING_MODEL": "Sentence Transformer model name (default: all-MiniLM-L6-v2)",
-        "DATABASE_PATH": "SQLite database path (default: ./data/chatbots.db)",
-        "VECTOR_STORE_PATH": "Vector store path (default: ./data/vector_stores)",
-        "UPLOAD_FOLDER": "Upload folder path (default: ./data/uploads)"
-    }
-    
-    missing_required = []
-    missing_optional = []
-    
-    # Check required variables
-    for var, description in required_vars.items():
-        if not os.getenv(var):
-            missing_required.append(f"  - {var}: {description}")
-    
-    # Check optional variables
-    for var, description in optional_vars.items():
-        if not os.getenv(var):
-            missing_optional.append(f"  - {var}: {description}")
+    # Variables set to an empty string count as missing
+    present = frozenset(name for name in _CHECKED_NAMES if os.environ.get(name))
+    return _check_present_variables(present)
+
+
+@lru_cache(maxsize=1)
+def _check_present_variables(present):
+    """
+    Report missing variables given the names that are set.
+
+    Args:
+        present: Frozenset of checked variable names with non-empty values
+
+    Returns:
+        bool: True if all required variables are set, False otherwise
+    """
+    missing_required = _REQUIRED_NAMES - present
+    missing_optional = _OPTIONAL_NAMES - present
     
     # Report missing variables
     if missing_required:
         logger.error("Missing required environment variables:")
-        for msg in missing_required:
-            logger.error(msg)
+        for var in sorted(missing_required):
+            logger.error("  - %s: %s", var, REQUIRED_VARS[var])
         logger.error("\nPlease set these variables in your .env file or environment.")
         logger.error("See .env.example for reference.")
         return False
     
     if missing_optional:
         logger.warning("Missing optional environment variables (using defaults):")
-        for msg in missing_optional:
-            logger.warning(msg)
+        for var in sorted(missing_optional):
+            logger.warning("  - %s: %s", var, OPTIONAL_VARS[var])
     
     logger.info("Environment check passed")
     return True
 
 
+def serve_production(app, host, port):
+    """
+    Serve the application with the Waitress WSGI server.
+
+    Falls back to the Flask server (without debug) if waitress is not installed.
+
+    Args:
+        app: Flask application instance
+        host: Interface to bind to
+        port: Port to listen on
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress is not installed, falling back to the Flask development server")
+        logger.warning("Install it with: pip install waitress")
+        app.run(host=host, port=port, debug=False)
+        return
+
+    threads = app.config["WAITRESS_THREADS"]
+    logger.info("Waitress threads: %d", threads)
+    serve(app, host=host, port=port, threads=threads)
+
+
 def main():
     """
     Main entry point for the application.
@@ -98,7 +138,10 @@ def main():
     debug = os.getenv("FLASK_ENV", "development") == "development"
     
     # Start the server
-    logger.info("Starting Flask development server...")
+    if debug:
+        logger.info("Starting Flask development server...")
+    else:
+        logger.info("Starting production WSGI server...")
     logger.info("Host: %s", host)
     logger.info("Port: %d", port)
     logger.info("Debug mode: %s", debug)
@@ -108,7 +151,10 @@ def main():
     logger.info("=" * 60)
     
     try:
-        app.run(host=host, port=port, debug=debug)
+        if debug:
+            app.run(host=host, port=port, debug=True)
+        else:
+            serve_production(app, host, port)
     except KeyboardInterrupt:
         logger.info("\nShutting down gracefully...")
     except Exception as e:
@@ -2,17 +2,165 @@
 Chatbot Service for managing chatbot lifecycle and metadata.
 """
 
-import uuid
+import copy
+import hashlib
 import logging
 import os
-import shutil
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 
-from models.database import get_db_connection
+from models.database import get_db_connection, purge_chunk_cache
+from models.semantic_cache import SemanticCache
 from models.vector_store_manager import VectorStoreManager
 
 logger = logging.getLogger(__name__)
 
+# Above this many loose files, unlink them with a single `rm` process on Linux
+_BULK_UNLINK_THRESHOLD = 32
+
+# Above this many loose files, unlink them concurrently on _UNLINK_POOL
+_PARALLEL_UNLINK_THRESHOLD = 4
+
+# Seconds a cached get_all_chatbots() result may be served
+_LIST_CACHE_TTL = 5.0
+
+# Capacity and lifetime (seconds) of the per-chatbot get_chatbot() cache
+_ROW_CACHE_SIZE = 256
+_ROW_CACHE_TTL = 60.0
+
+# Capacity and lifetime (seconds) of the cache of generated query responses
+_RESPONSE_CACHE_SIZE = 4096
+_RESPONSE_CACHE_TTL = 3600.0
+
+# Background workers that remove deleted chatbots' vector stores
+_DELETE_WORKER = ThreadPoolExecutor(max_workers=2, thread_name_prefix='vs-delete')
+
+# Worker threads for concurrent per-file unlinks
+_UNLINK_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='chatbot-unlink')
+
+# INSERT ... RETURNING is available from SQLite 3.35 onwards
+_SUPPORTS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Statuses a chatbot can move through during its lifecycle
+_VALID_STATUSES = frozenset(('creating', 'processing', 'ready', 'error'))
+
+# Column order of the chatbot rows returned by the single-chatbot queries
+_CHATBOT_COLUMNS = ('id', 'name', 'system_prompt', 'model', 'status', 'created_at', 'updated_at')
+
+# SQL statements, kept as constants so every call reuses the same string
+_SQL_INSERT_CHATBOT = (
+    "INSERT INTO chatbots (id, name, system_prompt, model, status) VALUES (?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_CHATBOT_RETURNING = (
+    _SQL_INSERT_CHATBOT
+    + " RETURNING id, name, system_prompt, model, status, created_at, updated_at"
+)
+_SQL_SELECT_CHATBOT = (
+    "SELECT id, name, system_prompt, model, status, created_at, updated_at "
+    "FROM chatbots WHERE id = ?"
+)
+# document_count is maintained by triggers on the documents table
+_SQL_LIST_CHATBOTS = (
+    "SELECT id, name, system_prompt, model, status, created_at, updated_at, document_count "
+    "FROM chatbots ORDER BY created_at DESC"
+)
+# Keyed by (system_prompt is updated, model is updated)
+_SQL_UPDATE_CHATBOT = {
+    (True, False): (
+        "UPDATE chatbots SET system_prompt = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    ),
+    (False, True): (
+        "UPDATE chatbots SET model = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+    ),
+    (True, True): (
+        "UPDATE chatbots SET system_prompt = ?, model = ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE id = ?"
+    ),
+}
+_SQL_UPDATE_STATUS = (
+    "UPDATE chatbots SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+)
+_SQL_SELECT_DOC_FILES = "SELECT file_path, content_hash FROM documents WHERE chatbot_id = ?"
+_SQL_DELETE_CHATBOT = "DELETE FROM chatbots WHERE id = ?"
+
+
+def _generate_chatbot_id() -> str:
+    """
+    Generate a time-ordered chatbot identifier using the UUIDv7 bit layout.
+
+    IDs are 32 lowercase hex characters whose leading 48 bits hold the creation
+    time in milliseconds, so new rows land at the end of the primary key index.
+
+    Returns:
+        Hex-encoded 128-bit identifier
+    """
+    value = (
+        (time.time_ns() // 1_000_000) << 80
+        | 0x7 << 76
+        | secrets.randbits(12) << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return f"{value:032x}"
+
+
+def _is_within(path: str, directory: str) -> bool:
+    """
+    Check whether a path lies inside a directory.
+
+    Args:
+        path: Path to check
+        directory: Absolute, normalized directory path
+
+    Returns:
+        True if path is the directory itself or located below it
+    """
+    return os.path.commonpath([directory, os.path.abspath(path)]) == directory
+
+
+def _require_str(value: Any, message: str) -> str:
+    """
+    Validate a required string argument and return it stripped.
+
+    Args:
+        value: Value to validate
+        message: Error message used if the value is missing or blank
+
+    Returns:
+        The value with surrounding whitespace removed
+
+    Raises:
+        ValueError: If value is not a string or is blank
+    """
+    if not isinstance(value, str):
+        raise ValueError(message)
+    stripped = value.strip()
+    if not stripped:
+        raise ValueError(message)
+    return stripped
+
+
+def _safe_unlink(file_path: str) -> None:
+    """
+    Delete a file, logging instead of raising on failure.
+
+    Args:
+        file_path: Path of the file to delete
+    """
+    try:
+        os.remove(file_path)
+        logger.info("Deleted file: %s", file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error("Failed to delete file '%s': %s", file_path, e)
+
 
 class ChatbotService:
     """
@@ -22,15 +170,41 @@ class ChatbotService:
     with cascade deletion of associated documents and vector stores.
     """
 
-    def __init__(self, vector_store_manager: Optional[VectorStoreManager] = None):
+    def __init__(
+        self,
+        vector_store_manager: Optional[VectorStoreManager] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        upload_folder: str = "./data/uploads"
+    ):
         """
         Initialize the ChatbotService.
 
         Args:
             vector_store_manager: Optional VectorStoreManager instance.
                                  If None, creates a new instance.
+            semantic_cache: Optional SemanticCache shared with QueryService,
+                invalidated together with this service's caches
+            upload_folder: Base directory holding each chatbot's uploaded
+                documents
         """
         self.vector_store_manager = vector_store_manager or VectorStoreManager()
+        self.semantic_cache = semantic_cache
+        self.upload_folder = os.path.normpath(upload_folder)
+
+        # Cached get_all_chatbots() result as (monotonic timestamp, chatbots)
+        # and an LRU of get_chatbot() results keyed by chatbot id. The
+        # generation counter lets a lookup that raced with an invalidation
+        # skip storing its (possibly stale) result.
+        self._cache_lock = threading.Lock()
+        self._list_cache: Optional[tuple[float, list[Dict[str, Any]]]] = None
+        self._row_cache: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._cache_generation = 0
+
+        # Generated query responses as key -> (timestamp, chatbot id, result),
+        # plus the keys held for each chatbot so they can be dropped together
+        self._response_cache: OrderedDict[bytes, tuple[float, str, Dict[str, Any]]] = OrderedDict()
+        self._response_keys: Dict[str, set[bytes]] = {}
+
         logger.info("ChatbotService initialized")
 
     def create_chatbot(self, name: str, system_prompt: str, model: str = 'gemini-2.5-flash') -> Dict[str, Any]:
@@ -57,60 +231,49 @@ class ChatbotService:
             Exception: If database operation fails
         """
         # Validate inputs
-        if not name or not isinstance(name, str) or not name.strip():
-            raise ValueError("Chatbot name is required and cannot be empty")
-
-        if not system_prompt or not isinstance(system_prompt, str) or not system_prompt.strip():
-            raise ValueError("System prompt is required and cannot be empty")
-
-        if not model or not isinstance(model, str) or not model.strip():
-            raise ValueError("Model is required and cannot be empty")
+        name = _require_str(name, "Chatbot name is required and cannot be empty")
+        system_prompt = _require_str(system_prompt, "System prompt is required and cannot be empty")
+        model = _require_str(model, "Model is required and cannot be empty")
 
         # Generate unique ID
-        chatbot_id = str(uuid.uuid4())
+        chatbot_id = _generate_chatbot_id()
 
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
 
-                # Insert chatbot record
-                cursor.execute("""
-                    INSERT INTO chatbots (id, name, system_prompt, model, status)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (chatbot_id, name.strip(), system_prompt.strip(), model.strip(), 'creating'))
-
-                # Retrieve the created chatbot
-                cursor.execute("""
-                    SELECT id, name, system_prompt, model, status, created_at, updated_at
-                    FROM chatbots
-                    WHERE id = ?
-                """, (chatbot_id,))
-
-                row = cursor.fetchone()
-
-                chatbot = {
-                    'id': row['id'],
-                    'name': row['name'],
-                    'system_prompt': row['system_prompt'],
-                    'model': row['model'],
-                    'status': row['status'],
-                    'created_at': row['created_at'],
-                    'updated_at': row['updated_at']
-                }
-
-                logger.info("Created chatbot '%s' with id '%s' using model '%s'", name, chatbot_id, model)
-                return chatbot
+                params = (chatbot_id, name, system_prompt, model, 'creating')
+
+                if _SUPPORTS_RETURNING:
+                    # Insert and read back the created chatbot in a single statement
+                    cursor.execute(_SQL_INSERT_CHATBOT_RETURNING, params)
+                    row = cursor.fetchone()
+                else:
+                    # Insert chatbot record
+                    cursor.execute(_SQL_INSERT_CHATBOT, params)
+
+                    # Retrieve the created chatbot
+                    row = self._get_chatbot_row(conn, chatbot_id)
+
+                chatbot = dict(zip(_CHATBOT_COLUMNS, row))
+
+            self.invalidate_cache(chatbot_id)
+
+            logger.info("Created chatbot '%s' with id '%s' using model '%s'", name, chatbot_id, model)
+            return chatbot
 
         except Exception as e:
-            logger.error("Failed to create chatbot '%s': %s", name, str(e))
+            logger.error("Failed to create chatbot '%s': %s", name, e)
             raise Exception(f"Chatbot creation failed: {str(e)}") from e
 
-    def get_chatbot(self, chatbot_id: str) -> Optional[Dict[str, Any]]:
+    def get_chatbot(self, chatbot_id: str, max_age: float = _ROW_CACHE_TTL) -> Optional[Dict[str, Any]]:
         """
         Retrieve a chatbot by ID.
 
         Args:
             chatbot_id: Unique identifier of the chatbot
+            max_age: Oldest cached row (in seconds) the caller accepts. Other
+                worker processes' changes only show up once it expires.
 
         Returns:
             Dictionary containing chatbot metadata if found, None otherwise:
@@ -122,46 +285,59 @@ class ChatbotService:
                 - created_at: Creation timestamp
                 - updated_at: Last update timestamp
 
+        Found chatbots are kept in a small LRU cache that is invalidated
+        whenever the chatbot is updated or deleted.
+
         Raises:
             ValueError: If chatbot_id is empty or invalid
             Exception: If database operation fails
         """
-        if not chatbot_id or not isinstance(chatbot_id, str) or not chatbot_id.strip():
-            raise ValueError("Chatbot ID is required and cannot be empty")
+        chatbot_id = _require_str(chatbot_id, "Chatbot ID is required and cannot be empty")
+
+        with self._cache_lock:
+            cached = self._row_cache.get(chatbot_id)
+            if cached is not None and time.monotonic() - cached[0] < max_age:
+                self._row_cache.move_to_end(chatbot_id)
+                return dict(cached[1])
+            generation = self._cache_generation
 
         try:
             with get_db_connection() as conn:
-                cursor = conn.cursor()
-
-                cursor.execute("""
-                    SELECT id, name, system_prompt, model, status, created_at, updated_at
-                    FROM chatbots
-                    WHERE id = ?
-                """, (chatbot_id.strip(),))
-
-                row = cursor.fetchone()
+                row = self._get_chatbot_row(conn, chatbot_id)
 
                 if row is None:
                     logger.warning("Chatbot with id '%s' not found", chatbot_id)
                     return None
 
-                chatbot = {
-                    'id': row['id'],
-                    'name': row['name'],
-                    'system_prompt': row['system_prompt'],
-                    'model': row['model'],
-                    'status': row['status'],
-                    'created_at': row['created_at'],
-                    'updated_at': row['updated_at']
-                }
+                chatbot = dict(zip(_CHATBOT_COLUMNS, row))
+
+            with self._cache_lock:
+                if generation == self._cache_generation:
+                    self._row_cache[chatbot_id] = (time.monotonic(), chatbot)
+                    self._row_cache.move_to_end(chatbot_id)
+                    if len(self._row_cache) > _ROW_CACHE_SIZE:
+                        self._row_cache.popitem(last=False)
 
-                logger.info("Retrieved chatbot with id '%s'", chatbot_id)
-                return chatbot
+            logger.debug("Retrieved chatbot with id '%s'", chatbot_id)
+            return dict(chatbot)
 
         except Exception as e:
-            logger.error("Failed to retrieve chatbot '%s': %s", chatbot_id, str(e))
+            logger.error("Failed to retrieve chatbot '%s': %s", chatbot_id, e)
             raise Exception(f"Chatbot retrieval failed: {str(e)}") from e
 
+    def _get_chatbot_row(self, conn: sqlite3.Connection, chatbot_id: str) -> Optional[sqlite3.Row]:
+        """
+        Fetch a chatbot row on an existing connection without validating input.
+
+        Args:
+            conn: Open database connection
+            chatbot_id: Already validated and stripped chatbot identifier
+
+        Returns:
+            Matching row, or None if the chatbot does not exist
+        """
+        return conn.execute(_SQL_SELECT_CHATBOT, (chatbot_id,)).fetchone()
+
     def get_all_chatbots(self) -> list[Dict[str, Any]]:
         """
         Retrieve all chatbots with document count.
@@ -177,49 +353,54 @@ class ChatbotService:
                 - updated_at: Last update timestamp
                 - document_count: Number of documents uploaded
 
+        Results are cached for a few seconds and invalidated whenever a chatbot
+        is created, updated, or deleted through this service.
+
         Raises:
             Exception: If database operation fails
         """
+        with self._cache_lock:
+            cached = self._list_cache
+            generation = self._cache_generation
+
+        if cached is not None and time.monotonic() - cached[0] < _LIST_CACHE_TTL:
+            return [dict(chatbot) for chatbot in cached[1]]
+
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
 
-                cursor.execute("""
-                    SELECT
-                        c.id,
-                        c.name,
-                        c.system_prompt,
-                        c.model,
-                        c.status,
-                        c.created_at,
-                        c.updated_at,
-                        COUNT(d.id) as document_count
-                    FROM chatbots c
-                    LEFT JOIN documents d ON c.id = d.chatbot_id
-                    GROUP BY c.id
-                    ORDER BY c.created_at DESC
-                """)
-
-                rows = cursor.fetchall()
+                # Plain tuples skip sqlite3.Row's by-name column lookups
+                cursor.row_factory = None
+                cursor.arraysize = 128
+
+                cursor.execute(_SQL_LIST_CHATBOTS)
 
                 chatbots = []
-                for row in rows:
-                    chatbots.append({
-                        'id': row['id'],
-                        'name': row['name'],
-                        'system_prompt': row['system_prompt'],
-                        'model': row['model'],
-                        'status': row['status'],
-                        'created_at': row['created_at'],
-                        'updated_at': row['updated_at'],
-                        'document_count': row['document_count']
-                    })
-
-                logger.info("Retrieved %d chatbots", len(chatbots))
-                return chatbots
+                while rows := cursor.fetchmany():
+                    chatbots.extend(
+                        {
+                            'id': row[0],
+                            'name': row[1],
+                            'system_prompt': row[2],
+                            'model': row[3],
+                            'status': row[4],
+                            'created_at': row[5],
+                            'updated_at': row[6],
+                            'document_count': row[7]
+                        }
+                        for row in rows
+                    )
+
+            with self._cache_lock:
+                if generation == self._cache_generation:
+                    self._list_cache = (time.monotonic(), chatbots)
+
+            logger.info("Retrieved %d chatbots", len(chatbots))
+            return [dict(chatbot) for chatbot in chatbots]
 
         except Exception as e:
-            logger.error("Failed to retrieve chatbots: %s", str(e))
+            logger.error("Failed to retrieve chatbots: %s", e)
             raise Exception(f"Chatbot retrieval failed: {str(e)}") from e
 
     def update_chatbot(self, chatbot_id: str, system_prompt: Optional[str] = None, model: Optional[str] = None) -> None:
@@ -235,51 +416,43 @@ class ChatbotService:
             ValueError: If chatbot_id is empty or if both system_prompt and model are None
             Exception: If database operation fails or chatbot not found
         """
-        if not chatbot_id or not isinstance(chatbot_id, str) or not chatbot_id.strip():
-            raise ValueError("Chatbot ID is required and cannot be empty")
+        chatbot_id = _require_str(chatbot_id, "Chatbot ID is required and cannot be empty")
 
         if system_prompt is None and model is None:
             raise ValueError("At least one of system_prompt or model must be provided")
 
+        if system_prompt is not None:
+            system_prompt = _require_str(system_prompt, "System prompt cannot be empty")
+
+        if model is not None:
+            model = _require_str(model, "Model cannot be empty")
+
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
 
-                # Build dynamic update query
-                update_fields = []
-                update_values = []
-
-                if system_prompt is not None:
-                    if not isinstance(system_prompt, str) or not system_prompt.strip():
-                        raise ValueError("System prompt cannot be empty")
-                    update_fields.append("system_prompt = ?")
-                    update_values.append(system_prompt.strip())
-
-                if model is not None:
-                    if not isinstance(model, str) or not model.strip():
-                        raise ValueError("Model cannot be empty")
-                    update_fields.append("model = ?")
-                    update_values.append(model.strip())
+                # The statement is picked from the fixed set of precomputed
+                # variants; its placeholders follow the same field order
+                if system_prompt is not None and model is not None:
+                    params = (system_prompt, model, chatbot_id)
+                elif system_prompt is not None:
+                    params = (system_prompt, chatbot_id)
+                else:
+                    params = (model, chatbot_id)
 
-                # Add updated_at timestamp
-                update_fields.append("updated_at = CURRENT_TIMESTAMP")
-                update_values.append(chatbot_id.strip())
+                query = _SQL_UPDATE_CHATBOT[(system_prompt is not None, model is not None)]
 
-                query = f"""
-                    UPDATE chatbots
-                    SET {', '.join(update_fields)}
-                    WHERE id = ?
-                """
-
-                cursor.execute(query, update_values)
+                cursor.execute(query, params)
 
                 if cursor.rowcount == 0:
                     raise Exception(f"Chatbot with id '{chatbot_id}' not found")
 
-                logger.info("Updated chatbot '%s'", chatbot_id)
+            self.invalidate_cache(chatbot_id)
+
+            logger.info("Updated chatbot '%s'", chatbot_id)
 
         except Exception as e:
-            logger.error("Failed to update chatbot '%s': %s", chatbot_id, str(e))
+            logger.error("Failed to update chatbot '%s': %s", chatbot_id, e)
             raise Exception(f"Chatbot update failed: {str(e)}") from e
 
     def update_chatbot_status(self, chatbot_id: str, status: str) -> None:
@@ -294,18 +467,15 @@ class ChatbotService:
             ValueError: If chatbot_id or status is empty or invalid
             Exception: If database operation fails or chatbot not found
         """
-        if not chatbot_id or not isinstance(chatbot_id, str) or not chatbot_id.strip():
-            raise ValueError("Chatbot ID is required and cannot be empty")
+        chatbot_id = _require_str(chatbot_id, "Chatbot ID is required and cannot be empty")
 
-        if not status or not isinstance(status, str) or not status.strip():
-            raise ValueError("Status is required and cannot be empty")
+        status_stripped = _require_str(status, "Status is required and cannot be empty")
 
         # Validate status value
-        valid_statuses = ['creating', 'processing', 'ready', 'error']
-        if status.strip() not in valid_statuses:
+        if status_stripped not in _VALID_STATUSES:
             raise ValueError(
                 f"Invalid status '{status}'. "
-                f"Must be one of: {', '.join(valid_statuses)}"
+                f"Must be one of: {', '.join(sorted(_VALID_STATUSES))}"
             )
 
         try:
@@ -313,26 +483,24 @@ class ChatbotService:
                 cursor = conn.cursor()
 
                 # Update status and updated_at timestamp
-                cursor.execute("""
-                    UPDATE chatbots
-                    SET status = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (status.strip(), chatbot_id.strip()))
+                cursor.execute(_SQL_UPDATE_STATUS, (status_stripped, chatbot_id))
 
                 if cursor.rowcount == 0:
                     raise Exception(f"Chatbot with id '{chatbot_id}' not found")
 
-                logger.info(
-                    "Updated chatbot '%s' status to '%s'",
-                    chatbot_id,
-                    status
-                )
+            self.invalidate_cache(chatbot_id)
+
+            logger.debug(
+                "Updated chatbot '%s' status to '%s'",
+                chatbot_id,
+                status
+            )
 
         except Exception as e:
             logger.error(
                 "Failed to update status for chatbot '%s': %s",
                 chatbot_id,
-                str(e)
+                e
             )
             raise Exception(f"Status update failed: {str(e)}") from e
 
@@ -341,9 +509,9 @@ class ChatbotService:
         Delete a chatbot with cascade deletion of documents and vector store.
 
         This method performs the following operations:
-        1. Deletes the chatbot's vector store
+        1. Deletes database records (documents and chatbot) in one transaction
         2. Deletes uploaded document files
-        3. Deletes database records (documents and chatbot)
+        3. Schedules deletion of the vector store on a background worker
 
         Args:
             chatbot_id: Unique identifier of the chatbot
@@ -352,75 +520,247 @@ class ChatbotService:
             ValueError: If chatbot_id is empty or invalid
             Exception: If deletion operation fails
         """
-        if not chatbot_id or not isinstance(chatbot_id, str) or not chatbot_id.strip():
-            raise ValueError("Chatbot ID is required and cannot be empty")
-
-        chatbot_id = chatbot_id.strip()
+        chatbot_id = _require_str(chatbot_id, "Chatbot ID is required and cannot be empty")
 
         try:
-            # First, verify chatbot exists
-            chatbot = self.get_chatbot(chatbot_id)
-            if chatbot is None:
-                raise Exception(f"Chatbot with id '{chatbot_id}' not found")
-
-            # Get document file paths before deletion
+            # Collect document file paths and delete the database records
+            # (CASCADE will handle documents) within a single transaction.
+            # IMMEDIATE takes the write lock up front, so the path list can't
+            # go stale and the DELETE never has to upgrade a read lock.
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT file_path FROM documents WHERE chatbot_id = ?
-                """, (chatbot_id,))
-                file_paths = [row['file_path'] for row in cursor.fetchall()]
-
-            # Delete vector store (if exists)
-            try:
-                self.vector_store_manager.delete_store(chatbot_id)
-                logger.info("Deleted vector store for chatbot '%s'", chatbot_id)
-            except FileNotFoundError:
-                logger.warning(
-                    "Vector store for chatbot '%s' not found, skipping",
-                    chatbot_id
-                )
-            except Exception as e:
-                logger.error(
-                    "Failed to delete vector store for chatbot '%s': %s",
-                    chatbot_id,
-                    str(e)
-                )
-                # Continue with deletion even if vector store deletion fails
-
-            # Delete uploaded files
-            for file_path in file_paths:
-                try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                        logger.info("Deleted file: %s", file_path)
-                except Exception as e:
-                    logger.error("Failed to delete file '%s': %s", file_path, str(e))
-                    # Continue with deletion even if file deletion fails
-
-            # Delete chatbot upload directory if it exists
-            upload_dir = os.path.join('./data/uploads', chatbot_id)
-            if os.path.exists(upload_dir):
-                try:
-                    shutil.rmtree(upload_dir)
-                    logger.info("Deleted upload directory for chatbot '%s'", chatbot_id)
-                except Exception as e:
-                    logger.error(
-                        "Failed to delete upload directory for chatbot '%s': %s",
-                        chatbot_id,
-                        str(e)
-                    )
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(_SQL_SELECT_DOC_FILES, (chatbot_id,))
+                document_rows = cursor.fetchall()
+                file_paths = [row['file_path'] for row in document_rows]
 
-            # Delete database records (CASCADE will handle documents)
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM chatbots WHERE id = ?", (chatbot_id,))
+                cursor.execute(_SQL_DELETE_CHATBOT, (chatbot_id,))
 
                 if cursor.rowcount == 0:
-                    raise Exception(f"Chatbot with id '{chatbot_id}' not found in database")
+                    raise Exception(f"Chatbot with id '{chatbot_id}' not found")
+
+                # Documents went with the chatbot (CASCADE); drop cached
+                # chunks of content nothing else uses
+                purge_chunk_cache(cursor, (row['content_hash'] for row in document_rows))
+
+            self.invalidate_cache(chatbot_id)
+
+            # The chatbot is gone once its records are, so the vector store
+            # can be cleaned up without holding the caller
+            _DELETE_WORKER.submit(self._delete_vector_store, chatbot_id)
+
+            self._delete_upload_files(chatbot_id, file_paths)
 
             logger.info("Successfully deleted chatbot '%s'", chatbot_id)
 
         except Exception as e:
-            logger.error("Failed to delete chatbot '%s': %s", chatbot_id, str(e))
+            logger.error("Failed to delete chatbot '%s': %s", chatbot_id, e)
             raise Exception(f"Chatbot deletion failed: {str(e)}") from e
+
+    def invalidate_cache(self, chatbot_id: Optional[str] = None) -> None:
+        """
+        Drop cached chatbot data after the underlying records changed.
+
+        Called by this service's own write methods, and by other services that
+        modify chatbots or their documents directly in the database.
+
+        Args:
+            chatbot_id: Chatbot whose data changed (None if unknown)
+        """
+        with self._cache_lock:
+            self._list_cache = None
+            if chatbot_id is None:
+                self._row_cache.clear()
+                self._response_cache.clear()
+                self._response_keys.clear()
+            else:
+                self._row_cache.pop(chatbot_id, None)
+                for key in self._response_keys.pop(chatbot_id, ()):
+                    self._response_cache.pop(key, None)
+            self._cache_generation += 1
+
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate(chatbot_id)
+
+    def get_cached_response(
+        self, chatbot: Dict[str, Any], question: str, k: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously generated response to the same question.
+
+        Args:
+            chatbot: Chatbot configuration the answer would be generated with
+                (id, system_prompt, model and updated_at)
+            question: User's question text
+            k: Number of context chunks the answer would be retrieved with
+
+        Returns:
+            Copy of the cached query result, or None if there is none
+        """
+        key = self._response_cache_key(chatbot, question, k)
+
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] >= _RESPONSE_CACHE_TTL:
+                self._drop_response(key)
+                return None
+            self._response_cache.move_to_end(key)
+            return copy.deepcopy(cached[2])
+
+    def put_cached_response(
+        self, chatbot: Dict[str, Any], question: str, k: int, result: Dict[str, Any]
+    ) -> None:
+        """
+        Store a generated response for reuse by identical questions.
+
+        Entries for a chatbot are dropped by invalidate_cache() whenever the
+        chatbot or its documents change.
+
+        Args:
+            chatbot: Chatbot configuration the answer was generated with
+            question: User's question text
+            k: Number of context chunks the answer was retrieved with
+            result: Query result to cache
+        """
+        key = self._response_cache_key(chatbot, question, k)
+        chatbot_id = chatbot['id']
+
+        with self._cache_lock:
+            self._response_cache[key] = (time.monotonic(), chatbot_id, copy.deepcopy(result))
+            self._response_cache.move_to_end(key)
+            self._response_keys.setdefault(chatbot_id, set()).add(key)
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._drop_response(next(iter(self._response_cache)))
+
+    def _drop_response(self, key: bytes) -> None:
+        """
+        Remove one response cache entry. The caller must hold _cache_lock.
+
+        Args:
+            key: Response cache key to remove
+        """
+        _, chatbot_id, _ = self._response_cache.pop(key)
+        keys = self._response_keys.get(chatbot_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._response_keys[chatbot_id]
+
+    @staticmethod
+    def _response_cache_key(chatbot: Dict[str, Any], question: str, k: int) -> bytes:
+        """
+        Build the response cache key from everything that shapes the answer.
+
+        updated_at changes on every status transition, so answers generated
+        before the chatbot was retrained never match afterwards.
+
+        Args:
+            chatbot: Chatbot configuration
+            question: User's question text
+            k: Number of context chunks retrieved for the answer
+
+        Returns:
+            16-byte digest identifying the response
+        """
+        normalized = " ".join(question.split()).lower()
+        material = "\x1f".join((
+            chatbot['id'],
+            chatbot['system_prompt'],
+            chatbot.get('model') or '',
+            str(chatbot.get('updated_at') or ''),
+            str(k),
+            normalized,
+        ))
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).digest()
+
+    def _delete_vector_store(self, chatbot_id: str) -> None:
+        """
+        Delete a chatbot's vector store, logging instead of raising on failure.
+
+        Args:
+            chatbot_id: Unique identifier of the chatbot
+        """
+        try:
+            self.vector_store_manager.delete_store(chatbot_id)
+            logger.info("Deleted vector store for chatbot '%s'", chatbot_id)
+        except FileNotFoundError:
+            logger.warning(
+                "Vector store for chatbot '%s' not found, skipping",
+                chatbot_id
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to delete vector store for chatbot '%s': %s",
+                chatbot_id,
+                e
+            )
+            # Continue with deletion even if vector store deletion fails
+
+    def _delete_upload_files(self, chatbot_id: str, file_paths: list[str]) -> None:
+        """
+        Delete a chatbot's uploaded files and upload directory.
+
+        Failures are logged and do not interrupt the remaining deletions.
+
+        Args:
+            chatbot_id: Unique identifier of the chatbot
+            file_paths: Stored paths of the chatbot's documents
+        """
+        import shutil
+
+        upload_dir = os.path.join(self.upload_folder, chatbot_id)
+        upload_root = os.path.abspath(upload_dir)
+
+        # Files inside the chatbot upload directory are removed together with
+        # the directory below, so only paths stored elsewhere are unlinked here
+        stray_paths = [
+            file_path for file_path in file_paths
+            if not _is_within(file_path, upload_root)
+        ]
+
+        # Hand large batches to a single `rm` process, but only for paths that
+        # are confined to the upload base directory
+        if (
+            len(stray_paths) > _BULK_UNLINK_THRESHOLD
+            and sys.platform.startswith('linux')
+            and all(_is_within(file_path, os.path.abspath(self.upload_folder)) for file_path in stray_paths)
+        ):
+            import subprocess
+
+            result = subprocess.run(
+                ['rm', '-f', '--', *stray_paths],
+                capture_output=True,
+                text=True,
+                check=False
+            )
+            if result.returncode == 0:
+                logger.info("Deleted %d files for chatbot '%s'", len(stray_paths), chatbot_id)
+            else:
+                logger.error(
+                    "Failed to delete some files for chatbot '%s': %s",
+                    chatbot_id,
+                    result.stderr.strip()
+                )
+            stray_paths = []
+
+        # Delete uploaded files, overlapping the unlinks when there are several
+        if len(stray_paths) > _PARALLEL_UNLINK_THRESHOLD:
+            list(_UNLINK_POOL.map(_safe_unlink, stray_paths))
+        else:
+            for file_path in stray_paths:
+                _safe_unlink(file_path)
+
+        # Delete chatbot upload directory if it exists
+        try:
+            shutil.rmtree(upload_dir)
+            logger.info("Deleted upload directory for chatbot '%s'", chatbot_id)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(
+                "Failed to delete upload directory for chatbot '%s': %s",
+                chatbot_id,
+                e
+            )
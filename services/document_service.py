@@ -2,11 +2,19 @@
 Document Service for handling file uploads, text extraction, and embedding generation.
 """
 
+import hashlib
 import os
-import uuid
+import re
+import secrets
 import logging
+import multiprocessing
 import shutil
-from typing import List, Dict, Any
+import sqlite3
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
@@ -16,17 +24,153 @@ except ImportError:
     from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 try:
-    from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
+    from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 except ImportError:
     # Fallback for older langchain versions
-    from langchain.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
+    from langchain.document_loaders import PyPDFLoader, Docx2txtLoader
 
-from models.database import get_db_connection
+try:
+    from langchain_community.document_loaders import PyMuPDFLoader
+except ImportError:
+    PyMuPDFLoader = None
+
+from models.database import get_db_connection, purge_chunk_cache
 from models.embedding_manager import EmbeddingManager
 from models.vector_store_manager import VectorStoreManager
 
 logger = logging.getLogger(__name__)
 
+# Training jobs run one at a time off the request thread, in this process so
+# they share the already-loaded embedding model
+_EMBEDDING_WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embedding-job')
+
+# Jobs that are queued but not yet started, per chatbot. Further requests for
+# the same chatbot join the queued job, which picks up every uploaded
+# document once it runs.
+_QUEUED_JOBS: Dict[str, Future] = {}
+_QUEUED_JOBS_LOCK = threading.Lock()
+
+# Start method for text extraction worker processes. Jobs run on a thread of
+# a multi-threaded server that holds torch and FAISS state, which must not be
+# forked; forkserver (spawn where unavailable) starts workers from a clean
+# process instead.
+_EXTRACT_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+if _EXTRACT_CONTEXT.get_start_method() == 'forkserver':
+    # Workers fork from a server that has already imported this module
+    _EXTRACT_CONTEXT.set_forkserver_preload([__name__])
+
+# Worker threads that write the files of a multi-file upload concurrently
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='upload-save')
+
+
+@lru_cache(maxsize=None)
+def _get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """
+    Return a shared text splitter for the given chunking configuration.
+
+    Splitters hold no per-call state, so one instance per configuration is
+    reused by the service and by every task a worker process runs.
+
+    Args:
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between consecutive chunks
+
+    Returns:
+        Configured RecursiveCharacterTextSplitter
+    """
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def _load_pdf(file_path: str) -> list:
+    """
+    Load the pages of a PDF, preferring PyMuPDF for speed.
+
+    Falls back to PyPDFLoader when PyMuPDF is not installed or cannot
+    parse the file.
+
+    Args:
+        file_path: Path to the PDF file
+
+    Returns:
+        List of LangChain documents, one per page
+    """
+    if PyMuPDFLoader is not None:
+        try:
+            return PyMuPDFLoader(file_path).load()
+        except Exception as e:
+            logger.debug("PyMuPDF could not load '%s', falling back to pypdf: %s", file_path, str(e))
+
+    return PyPDFLoader(file_path).load()
+
+
+def _extract_text(file_path: str, file_type: str) -> str:
+    """
+    Extract text from an already validated document file.
+
+    Args:
+        file_path: Path to the document file
+        file_type: Lowercase file type (pdf, txt, docx)
+
+    Returns:
+        Extracted text content as a string
+
+    Raises:
+        Exception: If text extraction fails
+    """
+    try:
+        # Select appropriate loader based on file type
+        if file_type == 'txt':
+            # Plain text is a single section, so read it directly rather
+            # than wrapping it in a loader document
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            if file_type == 'pdf':
+                documents = _load_pdf(file_path)
+            elif file_type == 'docx':
+                documents = Docx2txtLoader(file_path).load()
+            else:
+                raise ValueError(f"Unsupported file type: {file_type}")
+
+            # Combine all pages/sections into single text
+            text = "\n\n".join([doc.page_content for doc in documents])
+
+        logger.info("Extracted text from file '%s' (%d characters)", file_path, len(text))
+        return text
+
+    except Exception as e:
+        logger.error("Failed to extract text from '%s': %s", file_path, str(e))
+        raise Exception(f"Text extraction failed: {str(e)}") from e
+
+
+def _extract_and_chunk(document: Dict[str, Any], chunk_size: int, chunk_overlap: int) -> Tuple[str, List[str]]:
+    """
+    Extract a document's text and split it into chunks.
+
+    Runs in a worker process, so it only takes picklable arguments and
+    looks up the splitter from the per-process cache.
+
+    Args:
+        document: Document record with id, file_path and file_type
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between consecutive chunks
+
+    Returns:
+        Tuple of the document id and its chunks (empty if it has no text)
+    """
+    text = _extract_text(document['file_path'], document['file_type'].lower())
+
+    if not text or not text.strip():
+        return document['id'], []
+
+    return document['id'], _get_text_splitter(chunk_size, chunk_overlap).split_text(text)
+
 
 class DocumentService:
     """
@@ -37,7 +181,10 @@ class DocumentService:
     """
 
     # File validation constants
-    ALLOWED_EXTENSIONS = {'pdf', 'txt', 'docx'}
+    ALLOWED_EXTENSIONS = frozenset({'pdf', 'txt', 'docx'})
+    _EXTENSION_RE = re.compile(r'\.([A-Za-z0-9]+)$')
+    # Leading bytes each binary type must start with; text has no signature
+    _FILE_SIGNATURES = {'pdf': b'%PDF-', 'docx': b'PK\x03\x04'}
     MAX_FILE_SIZE_MB = 50
     MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
     MAX_FILES_PER_CHATBOT = 10
@@ -46,11 +193,15 @@ class DocumentService:
     CHUNK_SIZE = 800
     CHUNK_OVERLAP = 150
 
+    # Chunks encoded per model forward pass during training
+    EMBEDDING_BATCH_SIZE = 64
+
     def __init__(
         self,
         embedding_manager: EmbeddingManager,
         vector_store_manager: VectorStoreManager,
-        upload_folder: str = "./data/uploads"
+        upload_folder: str = "./data/uploads",
+        chatbot_service: Optional[Any] = None
     ):
         """
         Initialize the DocumentService.
@@ -59,20 +210,19 @@ class DocumentService:
             embedding_manager: EmbeddingManager instance for generating embeddings
             vector_store_manager: VectorStoreManager instance for storing embeddings
             upload_folder: Base directory for storing uploaded files
+            chatbot_service: Optional ChatbotService whose caches are
+                invalidated when documents or chatbot status change here
         """
         self.embedding_manager = embedding_manager
         self.vector_store_manager = vector_store_manager
         self.upload_folder = upload_folder
+        self.chatbot_service = chatbot_service
 
         # Create upload folder if it doesn't exist
         os.makedirs(upload_folder, exist_ok=True)
 
         # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.CHUNK_SIZE,
-            chunk_overlap=self.CHUNK_OVERLAP,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        self.text_splitter = _get_text_splitter(self.CHUNK_SIZE, self.CHUNK_OVERLAP)
 
         logger.info("DocumentService initialized")
 
@@ -86,37 +236,158 @@ class DocumentService:
         Returns:
             Lowercase file extension without the dot
         """
-        return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        match = self._EXTENSION_RE.search(filename)
+        return match.group(1).lower() if match else ''
 
-    def _validate_file_type(self, filename: str) -> bool:
+    def _has_valid_signature(self, file: FileStorage, extension: str) -> bool:
         """
-        Validate if file type is supported.
+        Check that an upload's leading bytes match its extension.
+
+        Catches renamed files before they are written to disk or handed to
+        a document loader. The stream is rewound afterwards.
 
         Args:
-            filename: Name of the file
+            file: FileStorage object
+            extension: Lowercase file extension without the dot
 
         Returns:
-            True if file type is supported, False otherwise
+            True if the content matches the extension (or the type has no
+            signature), False otherwise
         """
-        extension = self._get_file_extension(filename)
-        return extension in self.ALLOWED_EXTENSIONS
+        signature = self._FILE_SIGNATURES.get(extension)
+        if signature is None:
+            return True
 
-    def _validate_file_size(self, file: FileStorage) -> bool:
+        head = file.stream.read(len(signature))
+        file.stream.seek(0)
+        return head == signature
+
+    def _save_and_measure(self, file: FileStorage, dest_path: str) -> Optional[Tuple[int, str]]:
         """
-        Validate if file size is within limits.
+        Save an upload to disk while measuring and hashing it in the same pass.
+
+        Writing stops as soon as the size limit is exceeded, and the partial
+        file is removed.
 
         Args:
             file: FileStorage object
+            dest_path: Path the file is written to
+
+        Returns:
+            Tuple of (file size in bytes, SHA-256 hex digest), or None if the
+            file exceeds the size limit
+        """
+        hasher = hashlib.sha256()
+        size = 0
+
+        with open(dest_path, 'wb') as out:
+            while chunk := file.stream.read(1 << 20):
+                size += len(chunk)
+                if size > self.MAX_FILE_SIZE_BYTES:
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+
+        if size > self.MAX_FILE_SIZE_BYTES:
+            os.remove(dest_path)
+            return None
+
+        return size, hasher.hexdigest()
+
+    def _invalidate_chatbot_cache(self, chatbot_id: str) -> None:
+        """
+        Invalidate cached chatbot data after a direct database write.
+
+        Args:
+            chatbot_id: Chatbot whose records changed
+        """
+        if self.chatbot_service is not None:
+            self.chatbot_service.invalidate_cache(chatbot_id)
+
+    def _chunk_cache_key(self) -> str:
+        """
+        Identify the settings that determine a document's chunks and embeddings.
+
+        Returns:
+            Cache key combining the embedding model, normalization and
+            chunking configuration
+        """
+        model_name = getattr(self.embedding_manager, 'model_name', 'unknown')
+        return f"{model_name}:norm:{self.CHUNK_SIZE}:{self.CHUNK_OVERLAP}"
+
+    def _load_cached_chunks(
+        self,
+        cursor: sqlite3.Cursor,
+        content_hash: Optional[str],
+        config_key: str
+    ) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Load previously computed chunks and embeddings for a document's content.
+
+        The cache is best-effort: a missing table is treated as a miss.
+
+        Args:
+            cursor: Cursor on an open connection
+            content_hash: SHA-256 of the document content (None if unknown)
+            config_key: Result of _chunk_cache_key()
 
         Returns:
-            True if file size is valid, False otherwise
+            Tuple of (chunks, float32 embeddings array), or None on a miss
         """
-        # Seek to end to get file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)  # Reset to beginning
+        if not content_hash:
+            return None
 
-        return file_size <= self.MAX_FILE_SIZE_BYTES
+        try:
+            cursor.execute("""
+                SELECT text, embedding FROM chunk_cache
+                WHERE content_hash = ? AND config_key = ?
+                ORDER BY chunk_index
+            """, (content_hash, config_key))
+            rows = cursor.fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning("Chunk cache unavailable: %s", str(e))
+            return None
+
+        if not rows:
+            return None
+
+        chunks = [row[0] for row in rows]
+        embeddings = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32)
+        return chunks, embeddings.reshape(len(rows), -1)
+
+    def _store_cached_chunks(
+        self,
+        cursor: sqlite3.Cursor,
+        content_hash: Optional[str],
+        config_key: str,
+        chunks: List[str],
+        embeddings: np.ndarray
+    ) -> None:
+        """
+        Save a document's chunks and embeddings for reuse.
+
+        Args:
+            cursor: Cursor on an open connection
+            content_hash: SHA-256 of the document content (None if unknown)
+            config_key: Result of _chunk_cache_key()
+            chunks: Text chunks of the document
+            embeddings: Embeddings of the chunks, one row per chunk
+        """
+        if not content_hash:
+            return
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        try:
+            cursor.executemany("""
+                INSERT OR REPLACE INTO chunk_cache (content_hash, config_key, chunk_index, text, embedding)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (content_hash, config_key, i, chunk, embeddings[i].tobytes())
+                for i, chunk in enumerate(chunks)
+            ])
+        except sqlite3.OperationalError as e:
+            logger.warning("Chunk cache unavailable: %s", str(e))
 
     def _get_chatbot_upload_folder(self, chatbot_id: str) -> str:
         """
@@ -132,6 +403,55 @@ class DocumentService:
         os.makedirs(folder_path, exist_ok=True)
         return folder_path
 
+    def _save_upload(self, file: FileStorage, file_extension: str, chatbot_folder: str) -> Dict[str, Any]:
+        """
+        Save one validated upload under a new document ID.
+
+        Runs on an upload worker thread, so failures are returned as an
+        error entry rather than raised.
+
+        Args:
+            file: FileStorage object
+            file_extension: Lowercase file extension without the dot
+            chatbot_folder: Directory the file is written to
+
+        Returns:
+            Document row values (id, filename, file_type, file_size,
+            file_path, content_hash), or a dict with an "error" key
+        """
+        try:
+            # Generate unique document ID and secure filename
+            document_id = secrets.token_hex(16)
+            secure_name = secure_filename(file.filename)
+
+            # Create unique filename to avoid collisions
+            file_path = os.path.join(chatbot_folder, f"{document_id}.{file_extension}")
+
+            # Save file, validating its size and hashing its content
+            measured = self._save_and_measure(file, file_path)
+            if measured is None:
+                return {
+                    "filename": file.filename,
+                    "error": f"File size exceeds maximum of {self.MAX_FILE_SIZE_MB}MB"
+                }
+
+            file_size, content_hash = measured
+            return {
+                "id": document_id,
+                "filename": secure_name,
+                "file_type": file_extension,
+                "file_size": file_size,
+                "file_path": file_path,
+                "content_hash": content_hash
+            }
+
+        except Exception as e:
+            logger.error("Error uploading file '%s': %s", file.filename, str(e))
+            return {
+                "filename": file.filename,
+                "error": f"Failed to upload file: {str(e)}"
+            }
+
     def upload_documents(
         self,
         chatbot_id: str,
@@ -163,10 +483,15 @@ class DocumentService:
                 f"but {len(files)} provided"
             )
 
-        # Check existing document count
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+        uploaded_files = []
+        errors = []
+
+        # Use one connection for the count check and every document insert
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Check existing document count
+            try:
                 cursor.execute(
                     "SELECT COUNT(*) as count FROM documents WHERE chatbot_id = ?",
                     (chatbot_id,)
@@ -178,78 +503,109 @@ class DocumentService:
                         f"Upload would exceed maximum of {self.MAX_FILES_PER_CHATBOT} files. "
                         f"Current: {existing_count}, Attempting to add: {len(files)}"
                     )
-        except Exception as e:
-            logger.error("Failed to check existing document count: %s", str(e))
-            raise
-
-        uploaded_files = []
-        errors = []
+            except Exception as e:
+                logger.error("Failed to check existing document count: %s", str(e))
+                raise
 
-        chatbot_folder = self._get_chatbot_upload_folder(chatbot_id)
+            chatbot_folder = self._get_chatbot_upload_folder(chatbot_id)
 
-        for file in files:
-            try:
+            # Validate names, types and signatures before writing anything
+            accepted = []
+            for file in files:
                 # Validate file has a filename
                 if not file.filename:
                     errors.append({"filename": "unknown", "error": "No filename provided"})
                     continue
 
-                # Validate file type
-                if not self._validate_file_type(file.filename):
+                # Validate file type, keeping the extension for the stored name
+                file_extension = self._get_file_extension(file.filename)
+                if file_extension not in self.ALLOWED_EXTENSIONS:
                     errors.append({
                         "filename": file.filename,
-                        "error": f"Unsupported file type. Allowed types: {', '.join(self.ALLOWED_EXTENSIONS)}"
+                        "error": f"Unsupported file type. Allowed types: {', '.join(sorted(self.ALLOWED_EXTENSIONS))}"
                     })
                     continue
 
-                # Validate file size
-                if not self._validate_file_size(file):
+                if not self._has_valid_signature(file, file_extension):
                     errors.append({
                         "filename": file.filename,
-                        "error": f"File size exceeds maximum of {self.MAX_FILE_SIZE_MB}MB"
+                        "error": f"File content does not match its .{file_extension} extension"
                     })
                     continue
 
-                # Generate unique document ID and secure filename
-                document_id = str(uuid.uuid4())
-                secure_name = secure_filename(file.filename)
-                file_extension = self._get_file_extension(secure_name)
-
-                # Create unique filename to avoid collisions
-                unique_filename = f"{document_id}.{file_extension}"
-                file_path = os.path.join(chatbot_folder, unique_filename)
-
-                # Save file
-                file.save(file_path)
+                accepted.append((file, file_extension))
+
+            # Write the accepted files concurrently; results keep upload order
+            saved = []
+            futures = [
+                _UPLOAD_POOL.submit(self._save_upload, file, file_extension, chatbot_folder)
+                for file, file_extension in accepted
+            ]
+            for future in futures:
+                entry = future.result()
+                if "error" in entry:
+                    errors.append(entry)
+                else:
+                    saved.append(entry)
+
+            # Skip content this chatbot already has, or that appears earlier
+            # in this upload, so it is not embedded twice
+            known_hashes = set()
+            if saved:
+                placeholders = ", ".join("?" for _ in saved)
+                cursor.execute(
+                    f"SELECT content_hash FROM documents WHERE chatbot_id = ? AND content_hash IN ({placeholders})",
+                    (chatbot_id, *(entry['content_hash'] for entry in saved))
+                )
+                known_hashes = {row['content_hash'] for row in cursor.fetchall()}
 
-                # Get actual file size
-                file_size = os.path.getsize(file_path)
+            new_documents = []
+            for entry in saved:
+                if entry['content_hash'] in known_hashes:
+                    os.remove(entry['file_path'])
+                    errors.append({
+                        "filename": entry['filename'],
+                        "error": "Duplicate file: identical content has already been uploaded"
+                    })
+                    continue
 
-                # Save document metadata to database
-                with get_db_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO documents (id, chatbot_id, filename, file_type, file_size, file_path, status)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (document_id, chatbot_id, secure_name, file_extension, file_size, file_path, 'uploaded'))
+                known_hashes.add(entry['content_hash'])
+                new_documents.append(entry)
 
+            # Save document metadata to database in one batch
+            if new_documents:
+                try:
+                    cursor.executemany("""
+                        INSERT INTO documents (id, chatbot_id, filename, file_type, file_size, file_path, status, content_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, 'uploaded', ?)
+                    """, [
+                        (entry['id'], chatbot_id, entry['filename'], entry['file_type'],
+                         entry['file_size'], entry['file_path'], entry['content_hash'])
+                        for entry in new_documents
+                    ])
+                    conn.commit()
+                except Exception as e:
+                    logger.error("Failed to record uploaded documents: %s", str(e))
+                    for entry in new_documents:
+                        try:
+                            os.remove(entry['file_path'])
+                        except OSError:
+                            pass
+                    raise
+
+            for entry in new_documents:
                 uploaded_files.append({
-                    "id": document_id,
-                    "filename": secure_name,
-                    "file_type": file_extension,
-                    "file_size": file_size,
+                    "id": entry['id'],
+                    "filename": entry['filename'],
+                    "file_type": entry['file_type'],
+                    "file_size": entry['file_size'],
                     "status": "uploaded"
                 })
 
-                logger.info("Uploaded document '%s' for chatbot '%s'", secure_name, chatbot_id)
+                logger.info("Uploaded document '%s' for chatbot '%s'", entry['filename'], chatbot_id)
 
-            except Exception as e:
-                error_msg = f"Failed to upload file: {str(e)}"
-                errors.append({
-                    "filename": file.filename if file.filename else "unknown",
-                    "error": error_msg
-                })
-                logger.error("Error uploading file '%s': %s", file.filename, str(e))
+        if uploaded_files:
+            self._invalidate_chatbot_cache(chatbot_id)
 
         result = {
             "success": len(uploaded_files) > 0,
@@ -276,53 +632,60 @@ class DocumentService:
         chatbot_id = chatbot_id.strip()
 
         try:
-            # Collect existing document file paths
+            # Collect existing document file paths and delete the document
+            # records within a single transaction
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT file_path FROM documents WHERE chatbot_id = ?
+                    SELECT file_path, content_hash FROM documents WHERE chatbot_id = ?
                 """, (chatbot_id,))
                 file_rows = cursor.fetchall()
+
+                cursor.execute("DELETE FROM documents WHERE chatbot_id = ?", (chatbot_id,))
+                purge_chunk_cache(cursor, (row['content_hash'] for row in file_rows))
         except Exception as e:
-            logger.error("Failed to load existing documents for chatbot '%s': %s", chatbot_id, str(e))
+            logger.error("Failed to clear document records for chatbot '%s': %s", chatbot_id, str(e))
             raise
 
-        file_paths = [row['file_path'] for row in file_rows]
+        self._invalidate_chatbot_cache(chatbot_id)
 
-        # Delete individual files
+        chatbot_folder = os.path.join(self.upload_folder, chatbot_id)
+        folder_root = os.path.abspath(chatbot_folder)
+
+        # Files inside the chatbot upload directory go away with the directory
+        # below, so only paths stored elsewhere are deleted individually
+        file_paths = [
+            row['file_path'] for row in file_rows
+            if row['file_path']
+            and os.path.commonpath([folder_root, os.path.abspath(row['file_path'])]) != folder_root
+        ]
+
+        # Delete individual files; a file that is already gone needs no stat
         for file_path in file_paths:
             try:
-                if file_path and os.path.exists(file_path):
-                    os.remove(file_path)
-                    logger.debug("Deleted document file during reset: %s", file_path)
-            except Exception as e:
+                os.unlink(file_path)
+                logger.debug("Deleted document file during reset: %s", file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
                 logger.warning("Unable to delete file '%s' while resetting chatbot '%s': %s", file_path, chatbot_id, str(e))
 
         # Remove upload directory entirely to avoid stale files
-        chatbot_folder = os.path.join(self.upload_folder, chatbot_id)
-        if os.path.exists(chatbot_folder):
-            try:
-                shutil.rmtree(chatbot_folder)
-                logger.debug("Removed upload directory '%s' during reset", chatbot_folder)
-            except Exception as e:
-                logger.warning(
-                    "Failed to delete upload directory '%s' for chatbot '%s': %s",
-                    chatbot_folder,
-                    chatbot_id,
-                    str(e)
-                )
+        try:
+            shutil.rmtree(chatbot_folder)
+            logger.debug("Removed upload directory '%s' during reset", chatbot_folder)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(
+                "Failed to delete upload directory '%s' for chatbot '%s': %s",
+                chatbot_folder,
+                chatbot_id,
+                str(e)
+            )
         # Re-create clean directory for future files
         os.makedirs(chatbot_folder, exist_ok=True)
 
-        # Delete document records
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM documents WHERE chatbot_id = ?", (chatbot_id,))
-        except Exception as e:
-            logger.error("Failed to clear document records for chatbot '%s': %s", chatbot_id, str(e))
-            raise
-
         # Delete vector store so new embeddings don't mix with old ones
         try:
             self.vector_store_manager.delete_store(chatbot_id)
@@ -333,6 +696,118 @@ class DocumentService:
 
         logger.info("Reset documents and vector store for chatbot '%s'", chatbot_id)
 
+    def delete_document(self, chatbot_id: str, document_id: str) -> Dict[str, Any]:
+        """
+        Delete a single document from a chatbot.
+
+        Removes the document record and file, then drops its vectors from the
+        chatbot's vector store. The remaining documents are only re-embedded
+        when the store cannot remove vectors selectively.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            document_id: Unique identifier for the document
+
+        Returns:
+            Dictionary containing:
+                - success: True once the document is deleted
+                - document_id: ID of the deleted document
+                - filename: Name of the deleted document
+                - remaining_documents: Number of documents left on the chatbot
+
+        Raises:
+            ValueError: If an ID is invalid or the document is not found
+            Exception: If database or vector store operations fail
+        """
+        if not chatbot_id or not isinstance(chatbot_id, str) or not chatbot_id.strip():
+            raise ValueError("Chatbot ID is required to delete a document")
+
+        if not document_id or not isinstance(document_id, str) or not document_id.strip():
+            raise ValueError("Document ID is required")
+
+        chatbot_id = chatbot_id.strip()
+        document_id = document_id.strip()
+
+        # Read and delete the record, and count what is left, in one transaction
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT filename, file_path, content_hash FROM documents
+                WHERE id = ? AND chatbot_id = ?
+            """, (document_id, chatbot_id))
+            document = cursor.fetchone()
+
+            if document is None:
+                raise ValueError(f"Document '{document_id}' not found for chatbot '{chatbot_id}'")
+
+            cursor.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+            purge_chunk_cache(cursor, [document['content_hash']])
+            cursor.execute(
+                "SELECT COUNT(*) FROM documents WHERE chatbot_id = ?",
+                (chatbot_id,)
+            )
+            remaining_count = cursor.fetchone()[0]
+
+            # Answers are cached per updated_at (in every worker process), so
+            # bump it to retire answers drawn from the deleted document
+            cursor.execute("""
+                UPDATE chatbots SET updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (chatbot_id,))
+
+        self._invalidate_chatbot_cache(chatbot_id)
+
+        try:
+            os.unlink(document['file_path'])
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Unable to delete file '%s': %s", document['file_path'], str(e))
+
+        if remaining_count == 0:
+            # Nothing left to answer from; drop the store and send the
+            # chatbot back to its pre-training state
+            try:
+                self.vector_store_manager.delete_store(chatbot_id)
+            except FileNotFoundError:
+                pass
+
+            with get_db_connection() as conn:
+                conn.execute("""
+                    UPDATE chatbots
+                    SET status = 'creating', updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (chatbot_id,))
+            self._invalidate_chatbot_cache(chatbot_id)
+        else:
+            try:
+                removed = self.vector_store_manager.delete_by_metadata(
+                    chatbot_id, {"document_id": document_id}
+                )
+                logger.debug("Removed %d vectors for document '%s'", removed, document_id)
+            except FileNotFoundError:
+                # Not trained yet, so there are no vectors to remove
+                pass
+            except NotImplementedError:
+                logger.info(
+                    "Vector store for chatbot '%s' can't remove vectors selectively; re-embedding",
+                    chatbot_id
+                )
+                self.vector_store_manager.delete_store(chatbot_id)
+                with get_db_connection() as conn:
+                    conn.execute("""
+                        UPDATE documents SET status = 'uploaded' WHERE chatbot_id = ?
+                    """, (chatbot_id,))
+                self.enqueue_embedding_job(chatbot_id)
+
+        logger.info("Deleted document '%s' from chatbot '%s'", document_id, chatbot_id)
+
+        return {
+            "success": True,
+            "document_id": document_id,
+            "filename": document['filename'],
+            "remaining_documents": remaining_count
+        }
+
     def extract_text(self, file_path: str, file_type: str) -> str:
         """
         Extract text content from a document file using LangChain loaders.
@@ -357,32 +832,138 @@ class DocumentService:
         if file_type not in self.ALLOWED_EXTENSIONS:
             raise ValueError(
                 f"Unsupported file type: {file_type}. "
-                f"Allowed types: {', '.join(self.ALLOWED_EXTENSIONS)}"
+                f"Allowed types: {', '.join(sorted(self.ALLOWED_EXTENSIONS))}"
             )
 
-        try:
-            # Select appropriate loader based on file type
-            if file_type == 'pdf':
-                loader = PyPDFLoader(file_path)
-            elif file_type == 'txt':
-                loader = TextLoader(file_path, encoding='utf-8')
-            elif file_type == 'docx':
-                loader = Docx2txtLoader(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+        return _extract_text(file_path, file_type)
 
-            # Load documents
-            documents = loader.load()
+    def enqueue_embedding_job(self, chatbot_id: str) -> Future:
+        """
+        Queue embedding generation for a chatbot and return immediately.
 
-            # Combine all pages/sections into single text
-            text = "\n\n".join([doc.page_content for doc in documents])
+        The chatbot is marked as processing before the job is queued, so
+        callers can poll get_document_status (or the chatbot status) until
+        it becomes 'ready' or 'error'. If a job for the chatbot is already
+        queued and hasn't started, that job is returned instead of a new one.
 
-            logger.info("Extracted text from file '%s' (%d characters)", file_path, len(text))
-            return text
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+
+        Returns:
+            Future that resolves once the job has finished
+        """
+        with get_db_connection() as conn:
+            conn.execute("""
+                UPDATE chatbots
+                SET status = 'processing', updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (chatbot_id,))
+        self._invalidate_chatbot_cache(chatbot_id)
+
+        with _QUEUED_JOBS_LOCK:
+            future = _QUEUED_JOBS.get(chatbot_id)
+            if future is not None:
+                logger.info("Embedding job for chatbot '%s' is already queued", chatbot_id)
+                return future
+
+            future = _EMBEDDING_WORKER.submit(self._run_embedding_job, chatbot_id)
+            _QUEUED_JOBS[chatbot_id] = future
+
+        logger.info("Queued embedding job for chatbot '%s'", chatbot_id)
+        return future
+
+    def _run_embedding_job(self, chatbot_id: str) -> None:
+        """
+        Run a queued embedding job.
+
+        Failures are already recorded as the chatbot's 'error' status by
+        generate_embeddings, so they are only logged here.
 
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+        """
+        # Documents uploaded from here on need a new job
+        with _QUEUED_JOBS_LOCK:
+            _QUEUED_JOBS.pop(chatbot_id, None)
+
+        try:
+            self.generate_embeddings(chatbot_id)
         except Exception as e:
-            logger.error("Failed to extract text from '%s': %s", file_path, str(e))
-            raise Exception(f"Text extraction failed: {str(e)}") from e
+            logger.error("Embedding job for chatbot '%s' failed: %s", chatbot_id, str(e))
+
+    def _has_vectors(self, chatbot_id: str) -> bool:
+        """
+        Check whether a chatbot's vector store holds any vectors.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+
+        Returns:
+            True if the store exists and is not empty
+        """
+        try:
+            return self.vector_store_manager.count(chatbot_id) > 0
+        except FileNotFoundError:
+            return False
+
+    def _current_document_ids(
+        self,
+        cursor: sqlite3.Cursor,
+        chatbot_id: str,
+        document_ids: List[str]
+    ) -> Optional[set]:
+        """
+        Find which documents of a running job still exist.
+
+        Documents (or the whole chatbot) can be deleted or reset while a job
+        is extracting and embedding them.
+
+        Args:
+            cursor: Cursor on an open connection
+            chatbot_id: Unique identifier for the chatbot
+            document_ids: IDs of the documents the job is processing
+
+        Returns:
+            Set of the IDs still belonging to the chatbot, or None if the
+            chatbot itself has been deleted
+        """
+        cursor.execute("SELECT 1 FROM chatbots WHERE id = ?", (chatbot_id,))
+        if cursor.fetchone() is None:
+            return None
+
+        if not document_ids:
+            return set()
+
+        placeholders = ", ".join("?" for _ in document_ids)
+        cursor.execute(
+            f"SELECT id FROM documents WHERE chatbot_id = ? AND id IN ({placeholders})",
+            (chatbot_id, *document_ids)
+        )
+        return {row['id'] for row in cursor.fetchall()}
+
+    def _end_discarded_job(self, cursor: sqlite3.Cursor, chatbot_id: str) -> None:
+        """
+        Take a chatbot out of 'processing' after its job's documents were removed.
+
+        The chatbot is ready again if earlier training left vectors in its
+        store, and back to 'creating' otherwise.
+
+        Args:
+            cursor: Cursor on an open connection
+            chatbot_id: Unique identifier for the chatbot
+        """
+        status = 'ready' if self._has_vectors(chatbot_id) else 'creating'
+        cursor.execute("""
+            UPDATE chatbots
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'processing'
+        """, (status, chatbot_id))
+        cursor.connection.commit()
+        self._invalidate_chatbot_cache(chatbot_id)
+        logger.info(
+            "Documents of chatbot '%s' were removed during training; discarding results",
+            chatbot_id
+        )
 
     def generate_embeddings(self, chatbot_id: str) -> None:
         """
@@ -390,11 +971,11 @@ class DocumentService:
 
         This method:
         1. Retrieves all uploaded documents for the chatbot
-        2. Extracts text from each document
-        3. Chunks the text into smaller pieces
-        4. Generates embeddings for each chunk
-        5. Stores embeddings in the vector store
-        6. Updates document and chatbot status
+        2. Extracts text from each document and chunks it into smaller
+           pieces, one worker process per document
+        3. Generates embeddings for each chunk
+        4. Stores embeddings in the vector store
+        5. Updates document and chatbot status
 
         Args:
             chatbot_id: Unique identifier for the chatbot
@@ -404,144 +985,229 @@ class DocumentService:
             Exception: If embedding generation or storage fails
         """
         try:
-            # Get all uploaded documents for this chatbot
+            # One connection serves the whole job. Each phase commits as soon
+            # as its writes are done, so no transaction (and no write lock)
+            # stays open during extraction or embedding.
             with get_db_connection() as conn:
                 cursor = conn.cursor()
+
+                # Get all uploaded documents for this chatbot
                 cursor.execute("""
-                    SELECT id, filename, file_type, file_path, status
+                    SELECT id, filename, file_type, file_path, status, content_hash
                     FROM documents
                     WHERE chatbot_id = ? AND status = 'uploaded'
                 """, (chatbot_id,))
 
                 documents = cursor.fetchall()
 
-            if not documents:
-                raise ValueError(f"No uploaded documents found for chatbot '{chatbot_id}'")
+                if not documents:
+                    # An earlier job may have embedded the documents this one
+                    # was queued for; with a trained store there is nothing
+                    # left to do beyond undoing the 'processing' mark
+                    if self._has_vectors(chatbot_id):
+                        cursor.execute("""
+                            UPDATE chatbots SET status = 'ready'
+                            WHERE id = ? AND status = 'processing'
+                        """, (chatbot_id,))
+                        conn.commit()
+                        self._invalidate_chatbot_cache(chatbot_id)
+                        logger.info("No new documents to embed for chatbot '%s'", chatbot_id)
+                        return
 
-            logger.info("Processing %d documents for chatbot '%s'", len(documents), chatbot_id)
+                    raise ValueError(f"No uploaded documents found for chatbot '{chatbot_id}'")
 
-            # Update chatbot status to processing
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+                logger.info("Processing %d documents for chatbot '%s'", len(documents), chatbot_id)
+
+                # Update chatbot status to processing and mark every document
+                # as processing before the workers start
                 cursor.execute("""
                     UPDATE chatbots
                     SET status = 'processing', updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 """, (chatbot_id,))
-
-            all_chunks = []
-            all_metadata = []
-
-            # Process each document
-            for doc in documents:
-                document_id = doc['id']
-                filename = doc['filename']
-                file_type = doc['file_type']
-                file_path = doc['file_path']
-
-                try:
-                    # Update document status to processing
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE documents
-                            SET status = 'processing'
-                            WHERE id = ?
-                        """, (document_id,))
-
-                    # Extract text
-                    text = self.extract_text(file_path, file_type)
-
-                    if not text or not text.strip():
-                        logger.warning("No text extracted from document '%s'", filename)
-                        with get_db_connection() as conn:
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                UPDATE documents
-                                SET status = 'error'
-                                WHERE id = ?
-                            """, (document_id,))
+                cursor.executemany("""
+                    UPDATE documents
+                    SET status = 'processing'
+                    WHERE id = ?
+                """, [(doc['id'],) for doc in documents])
+                conn.commit()
+                self._invalidate_chatbot_cache(chatbot_id)
+
+                jobs = [dict(doc) for doc in documents]
+                chunks_by_document: Dict[str, List[str]] = {}
+                embeddings_by_document: Dict[str, np.ndarray] = {}
+
+                # (status, document_id) transitions, written in one batch
+                # once every document has been extracted or found cached
+                status_updates: List[Tuple[str, str]] = []
+
+                # Reuse chunks and embeddings computed earlier for identical
+                # content under the same model and chunking settings
+                config_key = self._chunk_cache_key()
+                for job in jobs:
+                    cached = self._load_cached_chunks(cursor, job['content_hash'], config_key)
+                    if cached is None:
                         continue
 
-                    # Split text into chunks
-                    chunks = self.text_splitter.split_text(text)
-
+                    chunks_by_document[job['id']], embeddings_by_document[job['id']] = cached
+                    status_updates.append(('completed', job['id']))
                     logger.info(
-                        "Split document '%s' into %d chunks",
-                        filename,
-                        len(chunks)
+                        "Reused %d cached chunks for document '%s'",
+                        len(cached[0]),
+                        job['filename']
                     )
 
-                    # Add chunks and metadata
-                    for i, chunk in enumerate(chunks):
-                        all_chunks.append(chunk)
-                        all_metadata.append({
-                            "document_id": document_id,
-                            "filename": filename,
-                            "chunk_index": i,
-                            "total_chunks": len(chunks)
-                        })
-
-                    # Update document status to completed
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE documents
-                            SET status = 'completed'
-                            WHERE id = ?
-                        """, (document_id,))
-
-                    logger.info("Successfully processed document '%s'", filename)
-
-                except Exception as e:
-                    logger.error("Failed to process document '%s': %s", filename, str(e))
-                    # Update document status to error
-                    with get_db_connection() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE documents
-                            SET status = 'error'
-                            WHERE id = ?
-                        """, (document_id,))
-                    # Continue processing other documents
-
-            if not all_chunks:
-                raise Exception("No text chunks generated from any documents")
-
-            # Generate embeddings for all chunks
-            logger.info("Generating embeddings for %d chunks", len(all_chunks))
-            embeddings = self.embedding_manager.encode(all_chunks)
-
-            # Create or load vector store
-            try:
-                # Try to load existing store
-                self.vector_store_manager.load_store(chatbot_id)
-            except FileNotFoundError:
-                # Create new store if it doesn't exist
-                dimension = self.embedding_manager.get_embedding_dimension()
-                self.vector_store_manager.create_store(chatbot_id, dimension)
-
-            # Add documents to vector store
-            self.vector_store_manager.add_documents(
-                chatbot_id,
-                all_chunks,
-                embeddings,
-                all_metadata
-            )
+                # Extract and chunk the remaining documents in parallel worker
+                # processes; database writes stay in this process
+                pending = [job for job in jobs if job['id'] not in chunks_by_document]
+
+                if pending:
+                    with ProcessPoolExecutor(
+                        max_workers=min(len(pending), os.cpu_count() or 1),
+                        mp_context=_EXTRACT_CONTEXT
+                    ) as executor:
+                        futures = {
+                            executor.submit(_extract_and_chunk, job, self.CHUNK_SIZE, self.CHUNK_OVERLAP): job
+                            for job in pending
+                        }
+
+                        for future in as_completed(futures):
+                            job = futures[future]
+                            document_id = job['id']
+                            filename = job['filename']
+
+                            try:
+                                _, chunks = future.result()
+                            except Exception as e:
+                                logger.error("Failed to process document '%s': %s", filename, str(e))
+                                chunks = None
+                            else:
+                                if not chunks:
+                                    logger.warning("No text extracted from document '%s'", filename)
+                                    chunks = None
+
+                            # Record document status as completed or error
+                            status_updates.append(('error' if chunks is None else 'completed', document_id))
+
+                            if chunks is None:
+                                # Continue processing other documents
+                                continue
+
+                            chunks_by_document[document_id] = chunks
+                            logger.info(
+                                "Split document '%s' into %d chunks",
+                                filename,
+                                len(chunks)
+                            )
+                            logger.info("Successfully processed document '%s'", filename)
+
+                cursor.executemany("""
+                    UPDATE documents
+                    SET status = ?
+                    WHERE id = ?
+                """, status_updates)
+                conn.commit()
+
+                ready_jobs = [job for job in jobs if chunks_by_document.get(job['id'])]
+                if not ready_jobs:
+                    raise Exception("No text chunks generated from any documents")
+
+                def document_batches():
+                    # Yield one document at a time in the original order,
+                    # embedding chunks that weren't cached just before they
+                    # are needed so only one document's embeddings are held
+                    for job in ready_jobs:
+                        chunks = chunks_by_document.pop(job['id'])
+                        embeddings = embeddings_by_document.pop(job['id'], None)
+
+                        if embeddings is None:
+                            logger.info(
+                                "Generating embeddings for %d chunks of '%s'",
+                                len(chunks),
+                                job['filename']
+                            )
+                            embeddings = self.embedding_manager.encode(
+                                chunks, batch_size=self.EMBEDDING_BATCH_SIZE
+                            )
+                            self._store_cached_chunks(
+                                cursor, job['content_hash'], config_key, chunks, embeddings
+                            )
+                            conn.commit()
+
+                        metadata = [
+                            {
+                                "document_id": job['id'],
+                                "filename": job['filename'],
+                                "chunk_index": i,
+                                "total_chunks": len(chunks)
+                            }
+                            for i in range(len(chunks))
+                        ]
+                        yield chunks, embeddings, metadata
+
+                # Drop documents deleted while they were being extracted, and
+                # stop if the chatbot was deleted or reset in the meantime
+                current_ids = self._current_document_ids(
+                    cursor, chatbot_id, [job['id'] for job in ready_jobs]
+                )
+                if current_ids is None:
+                    logger.info("Chatbot '%s' was deleted during training; discarding results", chatbot_id)
+                    return
+                ready_jobs = [job for job in ready_jobs if job['id'] in current_ids]
+                if not ready_jobs:
+                    self._end_discarded_job(cursor, chatbot_id)
+                    return
+
+                # Create or load vector store
+                try:
+                    # Try to load existing store
+                    self.vector_store_manager.load_store(chatbot_id)
+                except FileNotFoundError:
+                    # Create new store if it doesn't exist
+                    dimension = self.embedding_manager.get_embedding_dimension()
+                    self.vector_store_manager.create_store(chatbot_id, dimension)
+
+                # Stream documents into the vector store
+                total_chunks = self.vector_store_manager.add_document_batches(
+                    chatbot_id, document_batches()
+                )
 
-            # Update chatbot status to ready
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
+                # Undo what was added for documents (or a chatbot) deleted
+                # while embedding ran. The store also holds the vectors of
+                # earlier jobs, so it is only dropped with the chatbot itself.
+                added_ids = [job['id'] for job in ready_jobs]
+                current_ids = self._current_document_ids(cursor, chatbot_id, added_ids)
+                if current_ids is None:
+                    try:
+                        self.vector_store_manager.delete_store(chatbot_id)
+                    except FileNotFoundError:
+                        pass
+                    logger.info("Chatbot '%s' was deleted during training; discarding results", chatbot_id)
+                    return
+
+                for document_id in added_ids:
+                    if document_id not in current_ids:
+                        self.vector_store_manager.delete_by_metadata(
+                            chatbot_id, {"document_id": document_id}
+                        )
+
+                if not current_ids:
+                    self._end_discarded_job(cursor, chatbot_id)
+                    return
+
+                # Update chatbot status to ready (committed on leaving the block)
                 cursor.execute("""
                     UPDATE chatbots
                     SET status = 'ready', updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                 """, (chatbot_id,))
 
+            self._invalidate_chatbot_cache(chatbot_id)
+
             logger.info(
                 "Successfully generated embeddings for chatbot '%s' (%d chunks)",
                 chatbot_id,
-                len(all_chunks)
+                total_chunks
             )
 
         except Exception as e:
@@ -556,6 +1222,7 @@ class DocumentService:
                         SET status = 'error', updated_at = CURRENT_TIMESTAMP
                         WHERE id = ?
                     """, (chatbot_id,))
+                self._invalidate_chatbot_cache(chatbot_id)
             except Exception as update_error:
                 logger.error("Failed to update chatbot status: %s", str(update_error))
 
@@ -2,9 +2,18 @@
 Query Service for handling user queries with RAG pipeline.
 """
 
+import asyncio
+import datetime
+import hashlib
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+import numpy as np
 
 try:
     from langchain_google_genai import ChatGoogleGenerativeAI
@@ -22,12 +31,40 @@ try:
 except ImportError:
     GENAI_AVAILABLE = False
 
+# Context caching arrived in later releases of the SDK
+CACHING_AVAILABLE = GENAI_AVAILABLE and hasattr(genai, "caching")
+
 from models.embedding_manager import EmbeddingManager
+from models.semantic_cache import SemanticCache
 from models.vector_store_manager import VectorStoreManager
 from models.database import get_db_connection
 
 logger = logging.getLogger(__name__)
 
+# Speaker labels for conversation history turns included in prompts
+_HISTORY_ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+
+_PROMPT_INSTRUCTION = "\nPlease provide a helpful response based on the information above."
+
+
+
+def _config_version(chatbot: Dict[str, Any], k: int) -> str:
+    """
+    Identify the chatbot configuration an answer is generated under.
+
+    Args:
+        chatbot: Chatbot row with system_prompt, model and updated_at
+        k: Number of context chunks retrieved for the answer
+
+    Returns:
+        Version string that changes whenever the prompt, model, trained
+        store (via updated_at) or retrieval depth changes
+    """
+    prompt_hash = hashlib.blake2b(
+        chatbot["system_prompt"].encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return f"{chatbot['model']}:{chatbot['updated_at']}:{prompt_hash}:k{k}"
+
 
 class QueryService:
     """
@@ -37,11 +74,36 @@ class QueryService:
     generation of responses using Gemini API via LangChain.
     """
 
+    # Gemini calls allowed in flight at once per event loop (async path)
+    MAX_CONCURRENT_LLM_CALLS = 8
+
+    # Estimated prompt size (tokens) that retrieved context is trimmed to fit
+    MAX_PROMPT_TOKENS = 32768
+
+    # Oldest cached chatbot row (seconds) a query is answered with. Kept short
+    # so status, prompt and model changes made in other worker processes
+    # take effect quickly.
+    CONFIG_MAX_AGE = 5.0
+
+    # Distance above which retrieved documents are dropped by the query paths
+    MAX_CONTEXT_DISTANCE = 1.5
+
+    # System prompts of at least this many (estimated) tokens are stored with
+    # Gemini context caching for PROMPT_CACHE_TTL seconds; below Gemini's
+    # minimum cache size creation would only fail. A failed creation is
+    # retried after PROMPT_CACHE_RETRY seconds.
+    MIN_CACHED_PROMPT_TOKENS = 4096
+    PROMPT_CACHE_TTL = 3600
+    PROMPT_CACHE_RETRY = 60
+
     def __init__(
         self,
         embedding_manager: EmbeddingManager,
         vector_store_manager: VectorStoreManager,
         gemini_api_key: Optional[str] = None,
+        chatbot_service: Optional[Any] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        embed_workers: int = 8,
     ):
         """
         Initialize the QueryService with RAG components.
@@ -50,6 +112,13 @@ class QueryService:
             embedding_manager: EmbeddingManager instance for query embeddings
             vector_store_manager: VectorStoreManager instance for retrieval
             gemini_api_key: Google Gemini API key (defaults to env variable)
+            chatbot_service: Optional ChatbotService used to cache responses
+                to repeated questions
+            semantic_cache: Optional SemanticCache that serves stored
+                responses to near-duplicate questions
+            embed_workers: Threads that embed questions while the chatbot
+                config is loaded; one per server request thread means
+                concurrent queries never queue for them
 
         Raises:
             ImportError: If langchain-google-genai package is not installed
@@ -57,6 +126,15 @@ class QueryService:
         """
         self.embedding_manager = embedding_manager
         self.vector_store_manager = vector_store_manager
+        self.chatbot_service = chatbot_service
+        self.semantic_cache = semantic_cache
+        self._embed_pool = ThreadPoolExecutor(
+            max_workers=embed_workers, thread_name_prefix='query-embed'
+        )
+        self._llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._llm_semaphores_lock = threading.Lock()
 
         # Get API key from parameter or environment
         self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
@@ -67,8 +145,34 @@ class QueryService:
                 "Set GEMINI_API_KEY environment variable or pass as parameter."
             )
 
+        # Models are built once per model name and reused across queries
+        self._llm_cache: Dict[str, Any] = {}
+        self._llm_cache_lock = threading.Lock()
+
+        # (model name, system prompt hash) -> (model bound to cached prompt
+        # or None if caching failed, monotonic expiry time)
+        self._prompt_caches: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._prompt_caches_lock = threading.Lock()
+        # Keys whose cache is being created; the lock is not held meanwhile
+        self._prompt_caches_pending: set = set()
+
+        # The backend is fixed at import time, so pick its call methods once
+        if GENAI_AVAILABLE:
+            self._call_llm = self._call_genai
+            self._stream_llm = self._stream_genai
+            self._acall_llm = self._acall_genai
+        else:
+            self._call_llm = self._call_langchain
+            self._stream_llm = self._stream_langchain
+            self._acall_llm = self._acall_langchain
+
         # Initialize Gemini LLM
         try:
+            if GENAI_AVAILABLE:
+                # The SDK caches one gRPC client per service after configure,
+                # so every model and request shares the same HTTP/2 channel.
+                # Calling configure again (e.g. per request) discards them.
+                genai.configure(api_key=self.gemini_api_key, transport="grpc")
             self.llm = self._initialize_llm()
             logger.info("QueryService initialized with Gemini API")
         except Exception as e:
@@ -77,7 +181,10 @@ class QueryService:
 
     def _initialize_llm(self, model_name: str = "gemini-2.5-flash") -> Any:
         """
-        Initialize the Gemini LLM via LangChain or direct API.
+        Get the Gemini LLM for a model, via LangChain or direct API.
+
+        Each model is built on first use and reused afterwards; the SDK is
+        configured with the API key once, in __init__.
 
         Args:
             model_name: Name of the Gemini model to use
@@ -95,40 +202,147 @@ class QueryService:
                 "Install it with: pip install langchain-google-genai"
             )
 
+        llm = self._llm_cache.get(model_name)
+        if llm is not None:
+            return llm
+
         try:
-            # Use direct Google Generative AI SDK instead of LangChain wrapper
-            if GENAI_AVAILABLE:
-                genai.configure(api_key=self.gemini_api_key)
-                # Create model with specified name
-                model = genai.GenerativeModel(model_name)
-                logger.info("Initialized Gemini LLM (%s) via direct API", model_name)
-                return model
-            else:
-                # Fallback to LangChain
-                llm = ChatGoogleGenerativeAI(
-                    model=model_name,
-                    temperature=0.7,
-                    google_api_key=self.gemini_api_key,
-                )
-                logger.info("Initialized Gemini LLM (%s) via LangChain", model_name)
+            with self._llm_cache_lock:
+                llm = self._llm_cache.get(model_name)
+                if llm is not None:
+                    return llm
+
+                # Use direct Google Generative AI SDK instead of LangChain wrapper
+                if GENAI_AVAILABLE:
+                    # Create model with specified name
+                    llm = genai.GenerativeModel(model_name)
+                    logger.info("Initialized Gemini LLM (%s) via direct API", model_name)
+                else:
+                    # Fallback to LangChain
+                    llm = ChatGoogleGenerativeAI(
+                        model=model_name,
+                        temperature=0.7,
+                        google_api_key=self.gemini_api_key,
+                    )
+                    logger.info("Initialized Gemini LLM (%s) via LangChain", model_name)
+
+                self._llm_cache[model_name] = llm
                 return llm
         except Exception as e:
             logger.error("Failed to initialize Gemini LLM: %s", str(e))
             raise Exception(f"LLM initialization failed: {str(e)}") from e
 
+    def _model_for_prompt(self, model_name: str, system_prompt: str) -> Tuple[Any, str]:
+        """
+        Get the model to call and the system prompt still to send inline.
+
+        Long system prompts are stored once with Gemini context caching and
+        a model bound to the cache is returned with an empty inline prompt,
+        so requests carry only context, history and question. Short prompts,
+        the LangChain fallback and failed cache creation use the plain model,
+        as do requests arriving while another thread creates the cache.
+
+        Args:
+            model_name: Name of the Gemini model to use
+            system_prompt: System prompt defining chatbot behavior
+
+        Returns:
+            Tuple of (model, system prompt text to include in the prompt)
+        """
+        llm = self._initialize_llm(model_name)
+        if not CACHING_AVAILABLE or len(system_prompt) // 4 < self.MIN_CACHED_PROMPT_TOKENS:
+            return llm, system_prompt
+
+        key = (
+            model_name,
+            hashlib.blake2b(system_prompt.encode("utf-8"), digest_size=8).hexdigest(),
+        )
+        entry = self._prompt_caches.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            # Claim the creation under the lock, but make the network call
+            # outside it so other prompts' lookups are never held up
+            with self._prompt_caches_lock:
+                entry = self._prompt_caches.get(key)
+                fresh = entry is not None and entry[1] > time.monotonic()
+                if not fresh:
+                    if key in self._prompt_caches_pending:
+                        return llm, system_prompt
+                    self._prompt_caches_pending.add(key)
+
+            if not fresh:
+                model = None
+                try:
+                    model = self._create_prompt_cache(model_name, system_prompt)
+                finally:
+                    # Stop a little before the server drops the cache, and
+                    # retry failures soon since they may be transient
+                    now = time.monotonic()
+                    lifetime = (
+                        self.PROMPT_CACHE_TTL - 60 if model is not None
+                        else self.PROMPT_CACHE_RETRY
+                    )
+                    entry = (model, now + lifetime)
+                    with self._prompt_caches_lock:
+                        self._prompt_caches_pending.discard(key)
+                        self._prompt_caches = {
+                            k: v for k, v in self._prompt_caches.items() if v[1] > now
+                        }
+                        self._prompt_caches[key] = entry
+
+        if entry[0] is None:
+            return llm, system_prompt
+        return entry[0], ""
+
+    def _create_prompt_cache(self, model_name: str, system_prompt: str) -> Any:
+        """
+        Store a system prompt with Gemini context caching.
+
+        Args:
+            model_name: Name of the Gemini model to use
+            system_prompt: System prompt defining chatbot behavior
+
+        Returns:
+            Model bound to the cached prompt, or None if caching failed
+            (e.g. the model doesn't support it); the plain model is used then
+        """
+        try:
+            cached_content = genai.caching.CachedContent.create(
+                model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+                system_instruction=system_prompt,
+                ttl=datetime.timedelta(seconds=self.PROMPT_CACHE_TTL),
+            )
+            logger.info("Cached system prompt for model %s", model_name)
+            return genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+        except Exception as e:
+            logger.warning(
+                "Context caching unavailable for model %s, sending system prompt inline: %s",
+                model_name,
+                str(e)
+            )
+            return None
+
     def retrieve_context(
-        self, chatbot_id: str, question: str, k: int = 15, max_distance: float = 1.5
+        self,
+        chatbot_id: str,
+        question: Union[str, List[str]],
+        k: int = 15,
+        max_distance: float = 1.5,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant context from vector store using similarity search with score thresholding.
 
         Args:
             chatbot_id: Unique identifier for the chatbot
-            question: User's question text
+            question: User's question text, or several phrasings of it; all
+                phrasings are embedded in one batch and searched in one index
+                call, keeping each chunk's best distance
             k: Number of most similar documents to retrieve (default: 15)
             max_distance: Maximum distance threshold for filtering results (default: 1.5)
                          Lower values = stricter filtering, only very similar results
                          Higher values = more lenient, includes less similar results
+            query_embedding: Embedding(s) of the question, if the caller already
+                computed them
 
         Returns:
             List of dictionaries containing retrieved documents with metadata
@@ -142,18 +356,78 @@ class QueryService:
         if not chatbot_id or not isinstance(chatbot_id, str):
             raise ValueError("Valid chatbot_id is required")
 
-        if not question or not isinstance(question, str) or not question.strip():
+        questions = [question] if isinstance(question, str) else list(question or [])
+        if not questions or any(
+            not q or not isinstance(q, str) or not q.strip() for q in questions
+        ):
             raise ValueError("Valid question is required")
 
+        return self._search_context(
+            chatbot_id, questions, k, max_distance, query_embedding
+        )
+
+    def _search_context(
+        self,
+        chatbot_id: str,
+        questions: List[str],
+        k: int,
+        max_distance: float,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve context for questions the caller has already validated.
+
+        Implements retrieve_context; the query entry points call it directly
+        so their inputs aren't checked a second time.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            questions: Non-empty phrasings of the user's question
+            k: Number of most similar documents to retrieve
+            max_distance: Maximum distance threshold for filtering results
+            query_embedding: Embedding(s) of the questions, if already computed
+
+        Returns:
+            List of retrieved documents with metadata, filtered by distance
+
+        Raises:
+            ValueError: If the query embedding doesn't match the store
+            FileNotFoundError: If vector store doesn't exist
+            Exception: If retrieval fails
+        """
+        if k <= 0:
+            return []
+
         try:
-            # Generate embedding for the question
-            query_embedding = self.embedding_manager.encode(question.strip())
+            # An empty store can't match anything, so skip embedding entirely
+            if self.vector_store_manager.count(chatbot_id) == 0:
+                logger.warning("No documents found in vector store for chatbot '%s'", chatbot_id)
+                return []
 
-            # Perform similarity search
-            results = self.vector_store_manager.similarity_search(
-                chatbot_id, query_embedding, k=k
+            # Embed every phrasing in one batch unless the caller has them
+            if query_embedding is None:
+                query_embedding = self.embedding_manager.encode(
+                    [q.strip() for q in questions]
+                )
+
+            # Perform similarity search for all phrasings at once
+            batch_results = self.vector_store_manager.similarity_search_batch(
+                chatbot_id, np.atleast_2d(query_embedding), k=k
             )
 
+            if len(batch_results) == 1:
+                results = batch_results[0]
+            else:
+                # Merge phrasings, keeping each chunk's closest match
+                best: Dict[Any, Dict[str, Any]] = {}
+                for doc in (doc for row in batch_results for doc in row):
+                    current = best.get(doc["id"])
+                    if current is None or doc["score"] < current["score"]:
+                        best[doc["id"]] = doc
+                results = sorted(best.values(), key=lambda doc: doc["score"])[:k]
+                for rank, doc in enumerate(results, 1):
+                    doc["rank"] = rank
+
             # Log initial retrieval
             if results:
                 logger.info(
@@ -199,6 +473,150 @@ class QueryService:
             )
             raise Exception(f"Context retrieval failed: {str(e)}") from e
 
+    @staticmethod
+    def _render_history(history: Optional[List[Dict[str, str]]]) -> str:
+        """
+        Format conversation history the way prompts include it.
+
+        Args:
+            history: Conversation history (list of role/content dicts)
+
+        Returns:
+            One "Speaker: content" line per user or assistant turn, or an
+            empty string when there are none
+        """
+        return "\n".join(
+            f"{_HISTORY_ROLE_LABELS[msg.get('role', '')]}: {msg.get('content', '')}"
+            for msg in history or ()
+            if msg.get("role", "") in _HISTORY_ROLE_LABELS
+        )
+
+    def _build_prompt(
+        self,
+        question: str,
+        context: List[Dict[str, Any]],
+        system_prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        history_text: Optional[str] = None,
+    ) -> str:
+        """
+        Build the full Gemini prompt from the system prompt, context and history.
+
+        Args:
+            question: User's question text
+            context: List of retrieved context documents
+            system_prompt: System prompt defining chatbot behavior
+            history: Optional conversation history (list of role/content dicts)
+            history_text: History already rendered by _render_history; used
+                instead of formatting history again
+
+        Returns:
+            Prompt text sent to the model
+        """
+        prompt_parts = [system_prompt] if system_prompt else []
+
+        if context:
+            prompt_parts.append(
+                "\nRelevant information from documents:\n"
+                + "\n\n".join(
+                    f"[Document {i} - {doc.get('filename', 'Unknown')}]\n{doc.get('text', '')}"
+                    for i, doc in enumerate(context, 1)
+                )
+            )
+
+        if history_text is None:
+            history_text = self._render_history(history)
+        if history_text:
+            prompt_parts.append("\nConversation history:\n" + history_text)
+
+        prompt_parts.append(f"\nUser question: {question}")
+        prompt_parts.append(_PROMPT_INSTRUCTION)
+
+        return "\n".join(prompt_parts)
+
+    def _fit_context(
+        self,
+        question: str,
+        context: List[Dict[str, Any]],
+        system_prompt: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        history_text: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Drop the least similar context documents until the prompt fits the budget.
+
+        Token counts are estimated at four characters per token, which is
+        close enough to keep prompts inside MAX_PROMPT_TOKENS without a
+        tokenizer round-trip.
+
+        Args:
+            question: User's question text
+            context: Retrieved context documents, most similar first
+            system_prompt: System prompt defining chatbot behavior
+            history: Optional conversation history (list of role/content dicts)
+            history_text: History already rendered by _render_history
+
+        Returns:
+            The context documents that fit, in their original order
+        """
+        if history_text is None:
+            history_chars = sum(len(msg.get("content", "")) for msg in history or ())
+        else:
+            history_chars = len(history_text)
+        budget = self.MAX_PROMPT_TOKENS - (
+            len(system_prompt) + len(question) + history_chars
+        ) // 4
+
+        kept = []
+        for doc in sorted(context, key=lambda doc: doc.get("score", 0.0)):
+            cost = len(doc.get("text", "")) // 4 + 1
+            if cost > budget:
+                break
+            budget -= cost
+            kept.append(doc)
+
+        if len(kept) < len(context):
+            logger.info(
+                "Trimmed context from %d to %d documents to fit the prompt budget (%d tokens)",
+                len(context),
+                len(kept),
+                self.MAX_PROMPT_TOKENS
+            )
+            kept_ids = {id(doc) for doc in kept}
+            return [doc for doc in context if id(doc) in kept_ids]
+
+        return context
+
+    @staticmethod
+    def _call_genai(llm: Any, prompt: str) -> str:
+        """Send a prompt through the Google Generative AI SDK."""
+        return llm.generate_content(prompt).text
+
+    @staticmethod
+    def _call_langchain(llm: Any, prompt: str) -> str:
+        """Send a prompt through the LangChain wrapper."""
+        return llm.invoke(prompt).content
+
+    @staticmethod
+    def _stream_genai(llm: Any, prompt: str) -> Iterator[str]:
+        """Stream a response through the Google Generative AI SDK."""
+        return (chunk.text for chunk in llm.generate_content(prompt, stream=True))
+
+    @staticmethod
+    def _stream_langchain(llm: Any, prompt: str) -> Iterator[str]:
+        """Stream a response through the LangChain wrapper."""
+        return (chunk.content for chunk in llm.stream(prompt))
+
+    @staticmethod
+    async def _acall_genai(llm: Any, prompt: str) -> str:
+        """Send a prompt through the Google Generative AI SDK's async client."""
+        return (await llm.generate_content_async(prompt)).text
+
+    @staticmethod
+    async def _acall_langchain(llm: Any, prompt: str) -> str:
+        """Send a prompt through the LangChain wrapper's async interface."""
+        return (await llm.ainvoke(prompt)).content
+
     def generate_response(
         self,
         question: str,
@@ -206,6 +624,7 @@ class QueryService:
         system_prompt: str,
         model_name: str = "gemini-2.5-flash",
         history: Optional[List[Dict[str, str]]] = None,
+        history_text: Optional[str] = None,
     ) -> str:
         """
         Generate response using Gemini API with retrieved context.
@@ -219,6 +638,7 @@ class QueryService:
             system_prompt: System prompt defining chatbot behavior
             model_name: Name of the Gemini model to use
             history: Optional conversation history (list of role/content dicts)
+            history_text: History already rendered by _render_history
 
         Returns:
             Generated response text from Gemini
@@ -234,65 +654,141 @@ class QueryService:
             raise ValueError("Valid system_prompt is required")
 
         try:
-            # Initialize LLM with the specified model
-            llm = self._initialize_llm(model_name)
-
-            # Build context text from retrieved documents
-            context_text = ""
-            if context and len(context) > 0:
-                context_parts = []
-                for i, doc in enumerate(context, 1):
-                    text = doc.get("text", "")
-                    filename = doc.get("filename", "Unknown")
-                    context_parts.append(f"[Document {i} - {filename}]\n{text}")
-                context_text = "\n\n".join(context_parts)
-
-            # Build conversation history text
-            history_text = ""
-            if history and len(history) > 0:
-                history_parts = []
-                for msg in history:
-                    role = msg.get("role", "")
-                    content = msg.get("content", "")
-                    if role == "user":
-                        history_parts.append(f"User: {content}")
-                    elif role == "assistant":
-                        history_parts.append(f"Assistant: {content}")
-                history_text = "\n".join(history_parts)
-
-            # Construct the full prompt
-            prompt_parts = [system_prompt]
-
-            if context_text:
-                prompt_parts.append(
-                    f"\nRelevant information from documents:\n{context_text}"
-                )
+            # Get the LLM for the specified model (and cached system prompt)
+            llm, inline_prompt = self._model_for_prompt(model_name, system_prompt)
 
-            if history_text:
-                prompt_parts.append(f"\nConversation history:\n{history_text}")
-
-            prompt_parts.append(f"\nUser question: {question}")
-            prompt_parts.append(
-                "\nPlease provide a helpful response based on the information above."
+            full_prompt = self._build_prompt(
+                question, context, inline_prompt, history, history_text
             )
 
-            full_prompt = "\n".join(prompt_parts)
-
             # Call Gemini API
             logger.debug("Sending prompt to Gemini API with model %s", model_name)
 
-            if GENAI_AVAILABLE:
-                # Use direct Google Generative AI SDK
-                response = llm.generate_content(full_prompt)
-                response_text = response.text
-            else:
-                # Use LangChain wrapper
-                response = llm.invoke(full_prompt)
-                # Extract response text
-                if hasattr(response, "content"):
-                    response_text = response.content
-                else:
-                    response_text = str(response)
+            response_text = self._call_llm(llm, full_prompt)
+
+            logger.info(
+                "Generated response for question (length: %d) using model %s",
+                len(response_text),
+                model_name
+            )
+            return response_text
+
+        except Exception as e:
+            logger.error("Failed to generate response: %s", str(e))
+            raise Exception(
+                f"Response generation failed. Gemini API may be unavailable: {str(e)}"
+            ) from e
+
+    def generate_response_stream(
+        self,
+        question: str,
+        context: List[Dict[str, Any]],
+        system_prompt: str,
+        model_name: str = "gemini-2.5-flash",
+        history: Optional[List[Dict[str, str]]] = None,
+        history_text: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Generate a response like generate_response, yielding text as it arrives.
+
+        Args:
+            question: User's question text
+            context: List of retrieved context documents
+            system_prompt: System prompt defining chatbot behavior
+            model_name: Name of the Gemini model to use
+            history: Optional conversation history (list of role/content dicts)
+            history_text: History already rendered by _render_history
+
+        Yields:
+            Successive pieces of the response text
+
+        Raises:
+            ValueError: If inputs are invalid
+            Exception: If Gemini API call fails
+        """
+        if not question or not isinstance(question, str):
+            raise ValueError("Valid question is required")
+
+        if not system_prompt or not isinstance(system_prompt, str):
+            raise ValueError("Valid system_prompt is required")
+
+        try:
+            llm, inline_prompt = self._model_for_prompt(model_name, system_prompt)
+
+            full_prompt = self._build_prompt(
+                question, context, inline_prompt, history, history_text
+            )
+
+            logger.debug("Streaming prompt to Gemini API with model %s", model_name)
+
+            length = 0
+            for text in self._stream_llm(llm, full_prompt):
+                if text:
+                    length += len(text)
+                    yield text
+
+            logger.info(
+                "Streamed response for question (length: %d) using model %s",
+                length,
+                model_name
+            )
+
+        except Exception as e:
+            logger.error("Failed to generate response: %s", str(e))
+            raise Exception(
+                f"Response generation failed. Gemini API may be unavailable: {str(e)}"
+            ) from e
+
+    async def agenerate_response(
+        self,
+        question: str,
+        context: List[Dict[str, Any]],
+        system_prompt: str,
+        model_name: str = "gemini-2.5-flash",
+        history: Optional[List[Dict[str, str]]] = None,
+        history_text: Optional[str] = None,
+    ) -> str:
+        """
+        Generate a response like generate_response, without blocking the event loop.
+
+        Calls run through the SDK's async client and are limited to
+        MAX_CONCURRENT_LLM_CALLS in flight per event loop.
+
+        Args:
+            question: User's question text
+            context: List of retrieved context documents
+            system_prompt: System prompt defining chatbot behavior
+            model_name: Name of the Gemini model to use
+            history: Optional conversation history (list of role/content dicts)
+            history_text: History already rendered by _render_history
+
+        Returns:
+            Generated response text from Gemini
+
+        Raises:
+            ValueError: If inputs are invalid
+            Exception: If Gemini API call fails
+        """
+        if not question or not isinstance(question, str):
+            raise ValueError("Valid question is required")
+
+        if not system_prompt or not isinstance(system_prompt, str):
+            raise ValueError("Valid system_prompt is required")
+
+        try:
+            # Creating a prompt cache is a blocking API call
+            llm, inline_prompt = await asyncio.to_thread(
+                self._model_for_prompt, model_name, system_prompt
+            )
+
+            full_prompt = self._build_prompt(
+                question, context, inline_prompt, history, history_text
+            )
+
+            logger.debug("Sending prompt to Gemini API with model %s (async)", model_name)
+
+            async with self._llm_semaphore():
+                response_text = await self._acall_llm(llm, full_prompt)
 
             logger.info(
                 "Generated response for question (length: %d) using model %s",
@@ -307,6 +803,360 @@ class QueryService:
                 f"Response generation failed. Gemini API may be unavailable: {str(e)}"
             ) from e
 
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting concurrent LLM calls on the running event loop.
+
+        Returns:
+            Semaphore for the current event loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._llm_semaphores_lock:
+            semaphore = self._llm_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_LLM_CALLS)
+                self._llm_semaphores[loop] = semaphore
+        return semaphore
+
+    def _get_chatbot_config(self, chatbot_id: str) -> Dict[str, Any]:
+        """
+        Load the configuration of a chatbot that is ready to answer questions.
+
+        Uses ChatbotService's row cache (rows up to CONFIG_MAX_AGE seconds
+        old) when a chatbot service was provided, so repeated questions to
+        the same chatbot skip the database.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+
+        Returns:
+            Dictionary with id, name, system_prompt, model, status and updated_at
+
+        Raises:
+            ValueError: If the chatbot doesn't exist or isn't ready
+        """
+        if self.chatbot_service is not None:
+            chatbot = self.chatbot_service.get_chatbot(chatbot_id, max_age=self.CONFIG_MAX_AGE)
+        else:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, name, system_prompt, model, status, updated_at
+                    FROM chatbots
+                    WHERE id = ?
+                """,
+                    (chatbot_id,),
+                )
+
+                chatbot = cursor.fetchone()
+
+        if chatbot is None:
+            raise ValueError(f"Chatbot '{chatbot_id}' not found")
+
+        if chatbot["status"] != "ready":
+            raise ValueError(
+                f"Chatbot is not ready. Current status: {chatbot['status']}"
+            )
+
+        return dict(chatbot)
+
+    def _prepare_query(
+        self,
+        chatbot_id: str,
+        question: str,
+        chat_history: Optional[List[Dict[str, str]]],
+        k: int,
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run every query step that comes before response generation.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            question: User's question text
+            chat_history: Optional conversation history
+            k: Number of context documents to retrieve
+
+        Returns:
+            Tuple of (cached result or None, query state). The state holds
+            the chatbot configuration, retrieved context and what
+            _finish_query needs to cache the answer.
+
+        Raises:
+            ValueError: If the chatbot doesn't exist or isn't ready
+        """
+        # With nothing to retrieve there is nothing to embed;
+        # retrieve_context reports a missing store.
+        try:
+            searchable = k > 0 and self.vector_store_manager.count(chatbot_id) > 0
+        except FileNotFoundError:
+            searchable = False
+
+        # Answers that depend on earlier turns are never shared, so only
+        # standalone questions go through the response caches
+        use_cache = not chat_history
+        exact_cache = use_cache and self.chatbot_service is not None
+
+        # The question embedding doesn't depend on the chatbot, so compute it
+        # while the configuration is loaded - unless an exact-match cache hit
+        # could make it unnecessary, in which case it waits for the miss
+        embedding_future = (
+            self._embed_pool.submit(self.embedding_manager.encode, question.strip())
+            if searchable and not exact_cache
+            else None
+        )
+
+        # Get chatbot configuration
+        try:
+            chatbot = self._get_chatbot_config(chatbot_id)
+        except Exception:
+            if embedding_future is not None:
+                embedding_future.cancel()
+            raise
+        state: Dict[str, Any] = {
+            "chatbot": chatbot,
+            "history_text": self._render_history(chat_history),
+            "use_cache": use_cache,
+            "k": k,
+        }
+
+        if exact_cache:
+            cached = self.chatbot_service.get_cached_response(chatbot, question, k)
+            if cached is not None:
+                logger.info("Serving cached response for chatbot '%s'", chatbot_id)
+                return cached, state
+
+        # The question embedding serves both the semantic cache and retrieval
+        if embedding_future is not None:
+            query_embedding = embedding_future.result()
+        elif searchable:
+            query_embedding = self.embedding_manager.encode(question.strip())
+        else:
+            query_embedding = None
+        state["query_embedding"] = query_embedding
+
+        if use_cache and self.semantic_cache is not None and query_embedding is not None:
+            cached = self.semantic_cache.lookup(
+                chatbot_id, _config_version(chatbot, k), query_embedding
+            )
+            if cached is not None:
+                logger.info("Serving semantically cached response for chatbot '%s'", chatbot_id)
+                return cached, state
+
+        # Retrieve relevant context
+        logger.info("Retrieving context for query: '%s...' (chatbot: %s)", question[:50], chatbot_id)
+        context_docs = self._search_context(
+            chatbot_id,
+            [question],
+            k,
+            self.MAX_CONTEXT_DISTANCE,
+            query_embedding=query_embedding,
+        )
+        context_docs = self._fit_context(
+            question,
+            context_docs,
+            chatbot["system_prompt"],
+            history_text=state["history_text"],
+        )
+        state["context_docs"] = context_docs
+
+        # Log retrieval statistics
+        if context_docs:
+            logger.info(
+                "Retrieved %d documents after filtering (requested k=%d). "
+                "Distance range: %.3f - %.3f",
+                len(context_docs),
+                k,
+                min(doc.get("score", 0) for doc in context_docs),
+                max(doc.get("score", 0) for doc in context_docs)
+            )
+
+            # Log individual document scores for debugging
+            for i, doc in enumerate(context_docs, 1):
+                logger.debug(
+                    "  [%d] %s (chunk %d) - distance: %.3f",
+                    i,
+                    doc.get("filename", "Unknown"),
+                    doc.get("chunk_index", 0),
+                    doc.get("score", 0.0)
+                )
+        else:
+            logger.warning(
+                "No documents passed the distance threshold for chatbot '%s'. "
+                "Query may not match available content.",
+                chatbot_id
+            )
+
+        return None, state
+
+    def _prepare_batch(
+        self,
+        chatbot_id: str,
+        questions: List[str],
+        chat_histories: List[Optional[List[Dict[str, str]]]],
+        k: int,
+    ) -> List[Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Run the pre-generation query steps for several questions at once.
+
+        The chatbot configuration is loaded once, every question the
+        response caches can't answer is embedded in one batch, and all of
+        them are searched in one index call.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            questions: User questions
+            chat_histories: Conversation history per question (or None)
+            k: Number of context documents to retrieve per question
+
+        Returns:
+            One (cached result or None, query state) tuple per question, as
+            _prepare_query returns them
+
+        Raises:
+            ValueError: If the chatbot doesn't exist or isn't ready
+            FileNotFoundError: If the vector store doesn't exist
+        """
+        chatbot = self._get_chatbot_config(chatbot_id)
+
+        prepared = []
+        pending = []
+        for i, (question, history) in enumerate(zip(questions, chat_histories)):
+            state: Dict[str, Any] = {
+                "chatbot": chatbot,
+                "use_cache": not history,
+                "k": k,
+                "history_text": self._render_history(history),
+                "query_embedding": None,
+                "context_docs": [],
+            }
+            cached = None
+            if state["use_cache"] and self.chatbot_service is not None:
+                cached = self.chatbot_service.get_cached_response(chatbot, question, k)
+            prepared.append((cached, state))
+            if cached is None:
+                pending.append(i)
+
+        if not pending or k <= 0 or self.vector_store_manager.count(chatbot_id) == 0:
+            return prepared
+
+        # One forward pass for every question still needing an answer
+        embeddings = self.embedding_manager.encode(
+            [questions[i].strip() for i in pending]
+        )
+
+        version = _config_version(chatbot, k)
+        to_search = []
+        for row, i in enumerate(pending):
+            state = prepared[i][1]
+            state["query_embedding"] = embeddings[row:row + 1]
+            if state["use_cache"] and self.semantic_cache is not None:
+                cached = self.semantic_cache.lookup(
+                    chatbot_id, version, state["query_embedding"]
+                )
+                if cached is not None:
+                    prepared[i] = (cached, state)
+                    continue
+            to_search.append((i, row))
+
+        if to_search:
+            batch_results = self.vector_store_manager.similarity_search_batch(
+                chatbot_id, embeddings[[row for _, row in to_search]], k=k
+            )
+            for (i, _), results in zip(to_search, batch_results):
+                context_docs = [
+                    doc for doc in results
+                    if doc.get("score", float("inf")) <= self.MAX_CONTEXT_DISTANCE
+                ]
+                state = prepared[i][1]
+                state["context_docs"] = self._fit_context(
+                    questions[i],
+                    context_docs,
+                    chatbot["system_prompt"],
+                    history_text=state["history_text"],
+                )
+
+        logger.info(
+            "Prepared %d questions for chatbot '%s': %d cached, %d searched",
+            len(questions),
+            chatbot_id,
+            len(questions) - len(to_search),
+            len(to_search)
+        )
+        return prepared
+
+    @staticmethod
+    def _build_sources(context_docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Describe the retrieved chunks an answer was based on.
+
+        Args:
+            context_docs: Retrieved context documents
+
+        Returns:
+            List of source entries with filename, chunk_index and score
+        """
+        return [
+            {
+                "filename": doc.get("filename", "Unknown"),
+                "chunk_index": doc.get("chunk_index", 0),
+                "score": doc.get("score", 0.0),
+            }
+            for doc in context_docs
+        ]
+
+    def _finish_query(
+        self,
+        chatbot_id: str,
+        question: str,
+        response_text: str,
+        state: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Assemble the query result and cache it for later questions.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            question: User's question text
+            response_text: Generated response text
+            state: Query state returned by _prepare_query
+
+        Returns:
+            Query result with response, sources and chatbot_id
+        """
+        sources = self._build_sources(state["context_docs"])
+        unique_files = {source["filename"] for source in sources}
+
+        result = {
+            "response": response_text,
+            "sources": sources,
+            "chatbot_id": chatbot_id,
+        }
+
+        chatbot = state["chatbot"]
+        if state["use_cache"] and self.chatbot_service is not None:
+            self.chatbot_service.put_cached_response(chatbot, question, state["k"], result)
+        if (
+            state["use_cache"]
+            and self.semantic_cache is not None
+            and state["query_embedding"] is not None
+        ):
+            self.semantic_cache.put(
+                chatbot_id,
+                _config_version(chatbot, state["k"]),
+                state["query_embedding"],
+                result,
+            )
+
+        logger.info(
+            "Successfully processed query for chatbot '%s'. "
+            "Used %d chunks from %d unique files.",
+            chatbot_id,
+            len(sources),
+            len(unique_files)
+        )
+        return result
+
     def query(
         self,
         chatbot_id: str,
@@ -346,96 +1196,159 @@ class QueryService:
             raise ValueError("Valid question is required")
 
         try:
-            # Get chatbot configuration
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT id, name, system_prompt, model, status
-                    FROM chatbots
-                    WHERE id = ?
-                """,
-                    (chatbot_id,),
-                )
+            cached, state = self._prepare_query(chatbot_id, question, chat_history, k)
+            if cached is not None:
+                return cached
 
-                chatbot = cursor.fetchone()
+            # Generate response with the chatbot's selected model
+            chatbot = state["chatbot"]
+            model_name = chatbot["model"] or "gemini-2.5-flash"  # Default to gemini-2.5-flash if None
+            logger.info("Generating response using model: %s", model_name)
+            response_text = self.generate_response(
+                question,
+                state["context_docs"],
+                chatbot["system_prompt"],
+                model_name=model_name,
+                history=chat_history,
+                history_text=state["history_text"],
+            )
 
-                if chatbot is None:
-                    raise ValueError(f"Chatbot '{chatbot_id}' not found")
+            return self._finish_query(chatbot_id, question, response_text, state)
 
-                if chatbot["status"] != "ready":
-                    raise ValueError(
-                        f"Chatbot is not ready. Current status: {chatbot['status']}"
-                    )
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to process query for chatbot '%s': %s", chatbot_id, str(e)
+            )
+            raise Exception(f"Query processing failed: {str(e)}") from e
 
-                system_prompt = chatbot["system_prompt"]
-                model_name = chatbot["model"] or "gemini-2.5-flash"  # Default to gemini-2.5-flash if None
+    def stream_query(
+        self,
+        chatbot_id: str,
+        question: str,
+        chat_history: Optional[List[Dict[str, str]]] = None,
+        k: int = 15,
+    ) -> Tuple[Dict[str, Any], Iterator[str]]:
+        """
+        Process a user query like query(), streaming the response text.
 
-            # Retrieve relevant context
-            logger.info("Retrieving context for query: '%s...' (chatbot: %s)", question[:50], chatbot_id)
-            context_docs = self.retrieve_context(chatbot_id, question, k=k)
-            
-            # Log retrieval statistics
-            if context_docs:
-                logger.info(
-                    "Retrieved %d documents after filtering (requested k=%d). "
-                    "Distance range: %.3f - %.3f",
-                    len(context_docs),
-                    k,
-                    min(doc.get("score", 0) for doc in context_docs),
-                    max(doc.get("score", 0) for doc in context_docs)
-                )
-                
-                # Log individual document scores for debugging
-                for i, doc in enumerate(context_docs, 1):
-                    logger.debug(
-                        "  [%d] %s (chunk %d) - distance: %.3f",
-                        i,
-                        doc.get("filename", "Unknown"),
-                        doc.get("chunk_index", 0),
-                        doc.get("score", 0.0)
-                    )
-            else:
-                logger.warning(
-                    "No documents passed the distance threshold for chatbot '%s'. "
-                    "Query may not match available content.",
-                    chatbot_id
-                )
+        Everything up to generation (lookup, caches, retrieval) runs before
+        this returns, so errors such as an unknown chatbot are raised here
+        rather than mid-stream. The answer is cached once the stream has
+        been fully consumed.
 
-            # Generate response with the chatbot's selected model
-            logger.info("Generating response using model: %s", model_name)
-            response_text = self.generate_response(
-                question, context_docs, system_prompt, model_name=model_name, history=chat_history
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            question: User's question text
+            chat_history: Optional conversation history
+            k: Number of context documents to retrieve (default: 15)
+
+        Returns:
+            Tuple of (dictionary with sources and chatbot_id, iterator of
+            response text pieces)
+
+        Raises:
+            ValueError: If inputs are invalid or chatbot not found
+            Exception: If query processing fails before generation starts
+        """
+        if not chatbot_id or not isinstance(chatbot_id, str):
+            raise ValueError("Valid chatbot_id is required")
+
+        if not question or not isinstance(question, str) or not question.strip():
+            raise ValueError("Valid question is required")
+
+        try:
+            cached, state = self._prepare_query(chatbot_id, question, chat_history, k)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to process query for chatbot '%s': %s", chatbot_id, str(e)
             )
+            raise Exception(f"Query processing failed: {str(e)}") from e
 
-            # Prepare source information
-            sources = []
-            unique_files = set()
-            for doc in context_docs:
-                filename = doc.get("filename", "Unknown")
-                unique_files.add(filename)
-                sources.append(
-                    {
-                        "filename": filename,
-                        "chunk_index": doc.get("chunk_index", 0),
-                        "score": doc.get("score", 0.0),
-                    }
-                )
+        if cached is not None:
+            metadata = {"sources": cached["sources"], "chatbot_id": chatbot_id}
+            return metadata, iter([cached["response"]])
+
+        chatbot = state["chatbot"]
+        model_name = chatbot["model"] or "gemini-2.5-flash"
+        metadata = {
+            "sources": self._build_sources(state["context_docs"]),
+            "chatbot_id": chatbot_id,
+        }
+
+        def chunks() -> Iterator[str]:
+            logger.info("Streaming response using model: %s", model_name)
+            parts = []
+            for text in self.generate_response_stream(
+                question,
+                state["context_docs"],
+                chatbot["system_prompt"],
+                model_name=model_name,
+                history=chat_history,
+                history_text=state["history_text"],
+            ):
+                parts.append(text)
+                yield text
+            self._finish_query(chatbot_id, question, "".join(parts), state)
+
+        return metadata, chunks()
+
+    async def aquery(
+        self,
+        chatbot_id: str,
+        question: str,
+        chat_history: Optional[List[Dict[str, str]]] = None,
+        k: int = 15,
+    ) -> Dict[str, Any]:
+        """
+        Process a user query like query(), for callers running an event loop.
 
-            result = {
-                "response": response_text,
-                "sources": sources,
-                "chatbot_id": chatbot_id,
-            }
+        The database lookup, embedding and vector search run in a worker
+        thread, and the Gemini call awaits the SDK's async client, so many
+        queries can be in flight on one event loop.
 
-            logger.info(
-                "Successfully processed query for chatbot '%s'. "
-                "Used %d chunks from %d unique files.",
-                chatbot_id,
-                len(sources),
-                len(unique_files)
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            question: User's question text
+            chat_history: Optional conversation history
+            k: Number of context documents to retrieve (default: 15)
+
+        Returns:
+            Dictionary containing response, sources and chatbot_id
+
+        Raises:
+            ValueError: If inputs are invalid or chatbot not found
+            Exception: If query processing fails
+        """
+        if not chatbot_id or not isinstance(chatbot_id, str):
+            raise ValueError("Valid chatbot_id is required")
+
+        if not question or not isinstance(question, str) or not question.strip():
+            raise ValueError("Valid question is required")
+
+        try:
+            cached, state = await asyncio.to_thread(
+                self._prepare_query, chatbot_id, question, chat_history, k
             )
-            return result
+            if cached is not None:
+                return cached
+
+            chatbot = state["chatbot"]
+            model_name = chatbot["model"] or "gemini-2.5-flash"
+            logger.info("Generating response using model: %s", model_name)
+            response_text = await self.agenerate_response(
+                question,
+                state["context_docs"],
+                chatbot["system_prompt"],
+                model_name=model_name,
+                history=chat_history,
+                history_text=state["history_text"],
+            )
+
+            return self._finish_query(chatbot_id, question, response_text, state)
 
         except ValueError:
             raise
@@ -444,3 +1357,82 @@ class QueryService:
                 "Failed to process query for chatbot '%s': %s", chatbot_id, str(e)
             )
             raise Exception(f"Query processing failed: {str(e)}") from e
+
+    async def query_batch(
+        self,
+        chatbot_id: str,
+        questions: List[str],
+        chat_histories: Optional[List[Optional[List[Dict[str, str]]]]] = None,
+        k: int = 15,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several user queries to one chatbot together.
+
+        The questions share one configuration lookup, one embedding batch
+        and one vector search (in a worker thread); the Gemini calls then
+        run concurrently, bounded by MAX_CONCURRENT_LLM_CALLS.
+
+        Args:
+            chatbot_id: Unique identifier for the chatbot
+            questions: User questions
+            chat_histories: Optional conversation history per question
+            k: Number of context documents to retrieve per question (default: 15)
+
+        Returns:
+            One dictionary (response, sources, chatbot_id) per question, in
+            the order of questions
+
+        Raises:
+            ValueError: If inputs are invalid or chatbot not found
+            Exception: If query processing fails
+        """
+        if not chatbot_id or not isinstance(chatbot_id, str):
+            raise ValueError("Valid chatbot_id is required")
+
+        questions = list(questions or [])
+        if not questions or any(
+            not q or not isinstance(q, str) or not q.strip() for q in questions
+        ):
+            raise ValueError("Valid questions are required")
+
+        if chat_histories is None:
+            chat_histories = [None] * len(questions)
+        elif len(chat_histories) != len(questions):
+            raise ValueError(
+                f"Mismatch between number of questions ({len(questions)}) "
+                f"and chat histories ({len(chat_histories)})"
+            )
+
+        async def answer(question, history, cached, state):
+            if cached is not None:
+                return cached
+
+            chatbot = state["chatbot"]
+            response_text = await self.agenerate_response(
+                question,
+                state["context_docs"],
+                chatbot["system_prompt"],
+                model_name=chatbot["model"] or "gemini-2.5-flash",
+                history=history,
+                history_text=state["history_text"],
+            )
+            return self._finish_query(chatbot_id, question, response_text, state)
+
+        try:
+            prepared = await asyncio.to_thread(
+                self._prepare_batch, chatbot_id, questions, chat_histories, k
+            )
+
+            return list(await asyncio.gather(*(
+                answer(question, history, cached, state)
+                for question, history, (cached, state)
+                in zip(questions, chat_histories, prepared)
+            )))
+
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to process query batch for chatbot '%s': %s", chatbot_id, str(e)
+            )
+            raise Exception(f"Query processing failed: {str(e)}") from e